@@ -0,0 +1,125 @@
+"""Offline throughput benchmark for indexer.py
+
+Runs the indexer against the fake OpenRouter, the fake image server and a
+seeded in-memory collection, so no API credits or database are needed.
+The client makes no SDK-level retries, so every injected error shows up as
+a failed item, and a small untimed warm-up pass runs first so lazy imports
+(NumPy, Pillow) don't land in the first mode's numbers:
+
+    python bench_indexer.py --items 200 --latency 0.8 --batch-size 8
+"""
+import argparse
+import contextlib
+import io
+import os
+import resource
+import time
+import tracemalloc
+
+import clients
+from fake_mongo import FakeCollection, seed_listings
+from fake_openrouter import FakeOpenRouter, start_fake_openrouter, start_image_server
+
+MODES = {
+    'single': {'batch': False, 'dedup': False},
+    'batch': {'batch': True, 'dedup': False},
+    'single+dedup': {'batch': False, 'dedup': True},
+    'batch+dedup': {'batch': True, 'dedup': True},
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+def warm_up(indexer, args, image_url, items=4):
+    """Untimed pass over a few listings so one-off imports and caches are loaded"""
+    clients.configure(listings=FakeCollection(
+        seed_listings(items, image_url, duplicate_ratio=0.5, seed=args.seed)
+    ))
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        indexer.enhance_database(batch_size=args.batch_size, delay=0, dedup=True)
+
+def run_mode(indexer, mode, args, image_url):
+    """Run one indexer mode on a fresh collection and return its measurements"""
+    options = MODES[mode]
+    clients.configure(listings=FakeCollection(
+        seed_listings(args.items, image_url, duplicate_ratio=args.duplicate_ratio, seed=args.seed)
+    ))
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        stats = indexer.enhance_database(
+            batch_size=args.batch_size if options['batch'] else 1,
+            delay=0,
+            dedup=options['dedup']
+        )
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    processed = stats['successful'] + stats['duplicates']
+    return {
+        'mode': mode,
+        'items_per_sec': processed / elapsed if elapsed else 0.0,
+        'p95': percentile(stats['latencies'], 95),
+        'peak_mb': peak / 1024 / 1024,
+        'successful': stats['successful'],
+        'duplicates': stats['duplicates'],
+        'failed': stats['failed'],
+        'elapsed': elapsed
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark indexer.py against local fakes")
+    parser.add_argument('--items', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.5, help="Fake model seconds per request")
+    parser.add_argument('--jitter', type=float, default=0.1)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--duplicate-ratio', type=float, default=0.2, help="Fraction of listings reusing an earlier image")
+    parser.add_argument('--modes', default=','.join(MODES), help=f"Comma-separated subset of: {', '.join(MODES)}")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    fake = FakeOpenRouter(args.latency, args.jitter, args.error_rate, seed=args.seed)
+    chat_server, base_url = start_fake_openrouter(fake)
+    image_server, image_url = start_image_server()
+
+    os.environ.setdefault('INDEXER_IMAGE_VARIANTS', '0')
+    import indexer
+    from openai import OpenAI
+
+    # No SDK retries: they would quietly absorb the fake's injected errors
+    clients.configure(openrouter_client=OpenAI(
+        base_url=base_url, api_key='bench', timeout=clients.OPENROUTER_TIMEOUT, max_retries=0
+    ))
+
+    warm_up(indexer, args, image_url)
+    with fake.lock:
+        fake.requests = fake.errors = 0
+
+    print(f"🏁 Indexer benchmark: {args.items} items, {args.latency}s model latency, "
+          f"{args.error_rate:.0%} errors, {args.duplicate_ratio:.0%} duplicate images\n")
+    print(f"{'mode':<14}{'items/s':>10}{'p95 s':>10}{'peak MB':>10}{'ok':>6}{'dup':>6}{'fail':>6}{'wall s':>9}")
+
+    for mode in args.modes.split(','):
+        mode = mode.strip()
+        if mode not in MODES:
+            print(f"⚠️ Unknown mode {mode}, skipping")
+            continue
+        result = run_mode(indexer, mode, args, image_url)
+        print(f"{result['mode']:<14}{result['items_per_sec']:>10.2f}{result['p95']:>10.2f}"
+              f"{result['peak_mb']:>10.1f}{result['successful']:>6}{result['duplicates']:>6}"
+              f"{result['failed']:>6}{result['elapsed']:>9.1f}")
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\n📈 Process max RSS: {max_rss:.0f} MB  |  fake model requests: {fake.requests} ({fake.errors} errors)")
+
+    chat_server.shutdown()
+    image_server.shutdown()
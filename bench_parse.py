@@ -0,0 +1,71 @@
+"""Parse benchmark over a corpus of saved Depop pages
+
+fixtures/search holds a small committed corpus (an <li> grid, a flat grid,
+a card with no price and pages with __NEXT_DATA__). Grow it by crawling with
+SCRAPER_FIXTURE_DIR=fixtures/search (rendered pages) or by saving raw HTTP
+responses, then:
+
+    python bench_parse.py --repeat 5
+    python bench_parse.py path/to/other/pages
+"""
+import argparse
+import glob
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+import depop_http
+from depop_parse import extract_cards
+
+SEARCH_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'search')
+
+
+def available_parsers():
+    parsers = []
+    for name in ('lxml', 'html.parser', 'html5lib'):
+        try:
+            BeautifulSoup('<p></p>', name)
+            parsers.append(name)
+        except Exception:
+            continue
+    return parsers
+
+def bench(name, pages, repeat, parse):
+    """Time parse(html) over every page; prints pages/sec and products/page"""
+    products = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        products = 0
+        for html in pages:
+            products += len(parse(html))
+    elapsed = time.perf_counter() - started
+    runs = len(pages) * repeat
+    print(f"{name:<28}{runs / elapsed:>10.1f}{elapsed / runs * 1000:>10.2f}{products / len(pages):>12.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark search-page parsing on saved HTML")
+    parser.add_argument('fixtures', nargs='?', default=SEARCH_FIXTURES, help="Directory of saved .html pages")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--category', default='mens_shirts')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.fixtures, '*.html')))
+    if not paths:
+        raise SystemExit(f"No .html fixtures in {args.fixtures}")
+
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            pages.append(f.read())
+
+    total_kb = sum(len(page) for page in pages) / 1024
+    print(f"📄 {len(pages)} pages, {total_kb:.0f} KB, {args.repeat} repeats\n")
+    print(f"{'extractor':<28}{'pages/s':>10}{'ms/page':>10}{'items/page':>12}")
+
+    for backend in available_parsers():
+        bench(f"cards ({backend})", pages, args.repeat,
+              lambda html, backend=backend: extract_cards(html, args.category, parser=backend))
+    bench("embedded json", pages, args.repeat,
+          lambda html: depop_http.parse_search_html(html, args.category))
@@ -0,0 +1,78 @@
+"""Cold start benchmark for the API server and the indexing/scraping tools
+
+Each run is a fresh interpreter, like a new gunicorn worker: it measures
+importing the module, building the app (server only) and serving the
+first /api/ready request. Catalog warm-up is off and no database is
+needed, since nothing may connect before first use.
+
+    python bench_startup.py --runs 20
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+CHILD = r'''
+import json, time
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+result = {{'import': imported - started}}
+if {module!r} == 'server':
+    app = server.create_app(warm='off')
+    created = time.perf_counter()
+    response = app.test_client().get('/api/ready')
+    result['create_app'] = created - imported
+    result['first_request'] = time.perf_counter() - created
+    result['ready_status'] = response.status_code
+print(json.dumps(result))
+'''
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+def spawn(module):
+    """Start one fresh interpreter for a module; returns its timings in seconds"""
+    env = dict(os.environ, WARM_CATALOG='off')
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD.format(module=module)],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    spawn_seconds = time.perf_counter() - started
+    if output.returncode != 0:
+        raise RuntimeError(output.stderr.strip().splitlines()[-1] if output.stderr else 'child failed')
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    result['spawn'] = spawn_seconds
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure cold start and per-worker spawn time")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--modules', default='server,indexer,scraper', help="Comma-separated modules to import")
+    args = parser.parse_args()
+
+    print(f"🏁 Startup benchmark: {args.runs} fresh interpreters per module\n")
+    print(f"{'module':<10}{'metric':<15}{'median ms':>11}{'p95 ms':>10}")
+
+    for module in args.modules.split(','):
+        module = module.strip()
+        try:
+            runs = [spawn(module) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"⚠️ {module}: {e}")
+            continue
+        for metric in ('import', 'create_app', 'first_request', 'spawn'):
+            values = [run[metric] for run in runs if metric in run]
+            if values:
+                print(f"{module:<10}{metric:<15}{percentile(values, 50) * 1000:>11.1f}{percentile(values, 95) * 1000:>10.1f}")
+        if any(run.get('ready_status', 200) != 200 for run in runs):
+            print(f"⚠️ {module}: /api/ready did not return 200")
@@ -0,0 +1,219 @@
+"""In-memory snapshot of the servable catalog, warmed up when the server starts
+
+Holds every visible listing (not a near-duplicate, not sold/removed) with
+the fields the API needs, so recommendation candidates and image lookups
+don't have to scan MongoDB on every request.
+
+Every poll_interval seconds the listings whose updated_at moved since the
+last sync are re-read and applied (new, re-tagged, sold, marked duplicate),
+so changes made by the scraper, indexer and recrawler show up within about
+poll_interval. A full reload every refresh_interval seconds also picks up
+writes that don't set updated_at (manual edits, older tools).
+"""
+import os
+import random
+import re
+import threading
+import time
+
+# Seconds between full catalog reloads
+CATALOG_REFRESH = float(os.getenv('CATALOG_REFRESH', '300'))
+
+# Seconds between incremental polls for listings with a newer updated_at
+CATALOG_POLL = float(os.getenv('CATALOG_POLL', '10'))
+
+# Re-read this many seconds before the last sync to allow for writer clock skew
+POLL_OVERLAP = 5
+
+# Fields kept in memory for each listing
+CATALOG_FIELDS = {
+    'name': 1, 'url': 1, 'image': 1, 'price': 1, 'size': 1, 'category': 1,
+    'brand': 1, 'tags': 1, 'ai_description': 1,
+    'color_names': 1, 'pattern': 1, 'color_features.color_hist': 1
+}
+
+HIDDEN_STATUSES = ['sold', 'removed']
+
+
+def visible_listings_query(query=None):
+    """Listing query that hides near-duplicate cards and sold/removed listings"""
+    query = dict(query or {})
+    query['duplicate_of'] = {'$exists': False}
+    query['status'] = {'$nin': HIDDEN_STATUSES}
+    return query
+
+def is_visible(listing):
+    """In-memory equivalent of visible_listings_query()"""
+    return 'duplicate_of' not in listing and listing.get('status') not in HIDDEN_STATUSES
+
+
+def size_tokens(size):
+    """'S, M' / 'S/M' -> {'S', 'M'}"""
+    return {token.strip().upper() for token in re.split(r'[,/]', str(size or '')) if token.strip()}
+
+def listing_filter_query(filters):
+    """MongoDB query for the filters accepted by matches_filters()
+
+    Tag filters must be lowercase; stored tags are lowercased by the indexer
+    (indexer.py --normalize-tags fixes older listings).
+    """
+    query = {}
+    if filters.get('category'):
+        query['category'] = filters['category']
+    price = {}
+    if filters.get('min_price') is not None:
+        price['$gte'] = filters['min_price']
+    if filters.get('max_price') is not None:
+        price['$lte'] = filters['max_price']
+    if price:
+        query['price'] = price
+    if filters.get('colors'):
+        query['color_names'] = {'$in': list(filters['colors'])}
+    if filters.get('sizes'):
+        alternatives = '|'.join(re.escape(size) for size in filters['sizes'])
+        query['size'] = {'$regex': rf'^(.*[,/]\s*)?({alternatives})\s*([,/].*)?$', '$options': 'i'}
+    tags = {}
+    if filters.get('tags'):
+        tags['$all'] = list(filters['tags'])
+    if filters.get('exclude_tags'):
+        tags['$nin'] = list(filters['exclude_tags'])
+    if tags:
+        query['tags'] = tags
+    return query
+
+def matches_filters(listing, filters):
+    """In-memory equivalent of listing_filter_query()"""
+    if filters.get('category') and listing.get('category') != filters['category']:
+        return False
+    price = listing.get('price', 0)
+    if filters.get('min_price') is not None and price < filters['min_price']:
+        return False
+    if filters.get('max_price') is not None and price > filters['max_price']:
+        return False
+    if filters.get('colors') and not set(filters['colors']) & set(listing.get('color_names', [])):
+        return False
+    if filters.get('sizes') and not size_tokens(listing.get('size')) & {size.upper() for size in filters['sizes']}:
+        return False
+    if filters.get('tags') or filters.get('exclude_tags'):
+        # Filter tags are lowercase; stored ones are too once normalized, but don't rely on it
+        tags = {str(tag).lower() for tag in listing.get('tags', [])}
+        if not set(filters.get('tags', [])) <= tags:
+            return False
+        if tags & set(filters.get('exclude_tags', [])):
+            return False
+    return True
+
+
+class Catalog:
+    def __init__(self, refresh_interval=CATALOG_REFRESH, poll_interval=CATALOG_POLL):
+        self.refresh_interval = refresh_interval
+        self.poll_interval = min(poll_interval, refresh_interval)
+        self.listings = {}
+        self.loaded_at = None
+        self.synced_at = None
+        self.load_seconds = None
+        self.error = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @property
+    def loaded(self):
+        return self.loaded_at is not None
+
+    def load(self, collection):
+        """Replace the snapshot with the current visible listings"""
+        synced_at = time.time()
+        started = time.perf_counter()
+        listings = {}
+        for doc in collection.find(visible_listings_query(), CATALOG_FIELDS):
+            doc['_id'] = str(doc['_id'])
+            listings[doc['_id']] = doc
+        # Swap in one assignment so readers never see a half-built snapshot
+        self.listings = listings
+        self.loaded_at = self.synced_at = synced_at
+        self.load_seconds = time.perf_counter() - started
+        self.error = None
+        return len(listings)
+
+    def poll(self, collection):
+        """Apply listings updated since the last sync; returns how many changed"""
+        synced_at = time.time()
+        fields = dict(CATALOG_FIELDS, status=1, duplicate_of=1)
+        changes = {}
+        for doc in collection.find({'updated_at': {'$gte': self.synced_at - POLL_OVERLAP}}, fields):
+            doc['_id'] = str(doc['_id'])
+            visible = is_visible(doc)
+            doc.pop('status', None)
+            doc.pop('duplicate_of', None)
+            changes[doc['_id']] = doc if visible else None
+
+        if changes:
+            # Copy-on-write, like load(), so readers never see a partial update
+            listings = dict(self.listings)
+            for listing_id, doc in changes.items():
+                if doc is None:
+                    listings.pop(listing_id, None)
+                else:
+                    listings[listing_id] = doc
+            self.listings = listings
+        self.synced_at = synced_at
+        self.error = None
+        return len(changes)
+
+    def start(self, get_collection):
+        """Load in a background thread (unless already loaded), then poll and reload until stop()"""
+        def run():
+            if self.loaded:
+                self.stop_event.wait(self.poll_interval)
+            while not self.stop_event.is_set():
+                try:
+                    if self.loaded and time.time() - self.loaded_at < self.refresh_interval:
+                        changed = self.poll(get_collection())
+                        if changed:
+                            print(f"📦 Catalog updated: {changed} listings changed")
+                    else:
+                        count = self.load(get_collection())
+                        print(f"📦 Catalog loaded: {count} listings in {self.load_seconds:.2f}s")
+                except Exception as e:
+                    self.error = str(e)
+                    print(f"⚠️ Catalog refresh failed: {e}")
+                self.stop_event.wait(self.poll_interval if self.loaded else min(30, self.refresh_interval))
+
+        self.thread = threading.Thread(target=run, name='catalog-warmup', daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def stop(self):
+        self.stop_event.set()
+
+    def get(self, listing_id):
+        return self.listings.get(listing_id)
+
+    def _matching(self, category, exclude, filters):
+        exclude = exclude or ()
+        filters = dict(filters or {})
+        if category:
+            filters['category'] = category
+        return [
+            listing for listing_id, listing in self.listings.items()
+            if listing_id not in exclude and matches_filters(listing, filters)
+        ]
+
+    def candidates(self, category=None, exclude=None, filters=None):
+        """Visible listings, optionally in one category, matching filters and minus excluded IDs"""
+        return [dict(listing) for listing in self._matching(category, exclude, filters)]
+
+    def sample(self, count, category=None, exclude=None, filters=None):
+        """Up to count random candidates (copies only the ones picked)"""
+        matching = self._matching(category, exclude, filters)
+        return [dict(listing) for listing in random.sample(matching, min(count, len(matching)))]
+
+    def status(self):
+        return {
+            'loaded': self.loaded,
+            'listings': len(self.listings),
+            'age_seconds': round(time.time() - self.loaded_at, 1) if self.loaded else None,
+            'sync_age_seconds': round(time.time() - self.synced_at, 1) if self.loaded else None,
+            'load_seconds': round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            'error': self.error
+        }
@@ -0,0 +1,115 @@
+"""Check the page parsers against the saved pages in fixtures/
+
+Runs the card extractor and the embedded-JSON fast path over
+fixtures/search, and the product-page parser over fixtures/product, and
+compares what comes out with the expectations below. Product pages are
+also run through the sold/live status check. No network needed:
+
+    python check_fixtures.py
+"""
+import os
+import sys
+
+import depop_http
+from depop_parse import extract_cards
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Search page -> (name, price, size) per card, and names from __NEXT_DATA__
+SEARCH_CARDS = {
+    'li_grid.html': [
+        ('Vintage flannel shirt', 24.0, 'M'),
+        ("Levi's western denim shirt", 32.0, 'L'),
+        ('Hawaiian print shirt', 18.5, 'S, M'),
+    ],
+    'flat_grid.html': [
+        ('Pleated tennis skirt', 15.0, 'XS'),
+        ('Denim mini skirt', 22.0, 'S'),
+        ('Plaid midi skirt', 19.99, 'M'),
+        ('Satin slip skirt', 28.0, 'L'),
+    ],
+    # The middle card has no price; it must not borrow a neighbour's
+    'missing_price.html': [
+        ('Baggy carpenter jeans', 35.0, 'W32 L30'),
+        ('Wrangler straight jeans', 0.0, 'W30 L32'),
+        ("Levi's 501 jeans", 48.0, 'W34 L32'),
+    ],
+    'next_data.html': [],
+    'next_data_client_side.html': [],
+}
+SEARCH_JSON = {
+    'li_grid.html': [],
+    'flat_grid.html': [],
+    'missing_price.html': [],
+    # The product without pictures is skipped
+    'next_data.html': ['Cropped cardigan', 'knitnook mohair cardigan pink 4d5e', 'Ribbed crop top'],
+    # __NEXT_DATA__ present but results load client-side: nothing, so callers fall back to a browser
+    'next_data_client_side.html': [],
+}
+
+# Product page -> (name, price, image present, usable without a browser)
+PRODUCTS = {
+    'ld_json.html': ('Vintage flannel shirt', 24.0, True, True),
+    # JSON-LD has no image, __NEXT_DATA__ fills it in
+    'ld_json_no_image.html': ("Levi's western denim shirt", 32.0, True, True),
+    # JSON-LD has no image and there is nothing else: partial record, browser fallback
+    'ld_json_no_image_only.html': ('Hawaiian print shirt', 18.5, False, False),
+    'next_data.html': ('Cropped cardigan', 26.0, True, True),
+}
+
+# Product page -> parse_listing_status() (None = couldn't tell, recheck later)
+STATUSES = {
+    'ld_json.html': 'live',
+    'ld_json_no_image.html': 'live',
+    'next_data.html': 'live',
+    'sold.html': 'sold',
+    # Bot challenge with no product data must not count as live
+    'interstitial.html': None,
+}
+
+
+def read(*parts):
+    with open(os.path.join(FIXTURES, *parts), encoding='utf-8') as f:
+        return f.read()
+
+def check(failures, label, got, expected):
+    if got == expected:
+        print(f"  ✅ {label}")
+    else:
+        print(f"  ❌ {label}\n     expected {expected!r}\n     got      {got!r}")
+        failures.append(label)
+
+def check_search(failures):
+    print("🔎 Search pages")
+    for name, expected in SEARCH_CARDS.items():
+        html = read('search', name)
+        cards = extract_cards(html, 'fixtures')
+        check(failures, f"{name} cards", [(c['name'], c['price'], c['size']) for c in cards], expected)
+        check(failures, f"{name} card images", all(c['image'].startswith('https://') for c in cards), True)
+
+        products = depop_http.parse_search_html(html, 'fixtures')
+        check(failures, f"{name} embedded json", [p['name'] for p in products], SEARCH_JSON[name])
+
+def check_products(failures):
+    print("🛍️ Product pages")
+    for name, (title, price, has_image, usable) in PRODUCTS.items():
+        details = depop_http.parse_product_html(read('product', name))
+        if details is None:
+            check(failures, name, None, title)
+            continue
+        got = (details['name'], details['price'], details['image'].startswith('https://'),
+               depop_http.has_listing_essentials(details))
+        check(failures, name, got, (title, price, has_image, usable))
+
+    for name, expected in STATUSES.items():
+        check(failures, f"{name} status", depop_http.parse_listing_status(read('product', name)), expected)
+
+
+if __name__ == '__main__':
+    failures = []
+    check_search(failures)
+    check_products(failures)
+    if failures:
+        print(f"\n❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\n✅ All fixture checks passed")
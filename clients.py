@@ -0,0 +1,83 @@
+"""Lazily created, process-wide MongoDB and OpenRouter clients
+
+Nothing connects at import time: the first caller builds the client and
+everyone after shares it (MongoClient pools connections internally, the
+OpenAI client keeps an HTTP connection pool). Benchmarks and tools can
+swap in stand-ins with configure().
+"""
+import os
+import threading
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DB_NAME = 'thrifttinderDB'
+
+# Upper bound on pooled Mongo connections per process
+MONGO_POOL_SIZE = int(os.getenv('MONGO_POOL_SIZE', '20'))
+
+# Seconds before an OpenRouter request is abandoned
+OPENROUTER_TIMEOUT = float(os.getenv('OPENROUTER_TIMEOUT', '60'))
+
+_lock = threading.Lock()
+_mongo_client = None
+_listings = None
+_openrouter_client = None
+
+
+def get_mongo_client():
+    global _mongo_client
+    if _mongo_client is None:
+        with _lock:
+            if _mongo_client is None:
+                from pymongo import MongoClient
+                _mongo_client = MongoClient(
+                    os.getenv('MONGODB_URI'),
+                    maxPoolSize=MONGO_POOL_SIZE,
+                    connect=False
+                )
+    return _mongo_client
+
+def get_db():
+    return get_mongo_client()[DB_NAME]
+
+def get_listings():
+    """The listings collection"""
+    global _listings
+    if _listings is None:
+        listings = get_db()['listings']
+        with _lock:
+            if _listings is None:
+                _listings = listings
+    return _listings
+
+def get_openrouter_client():
+    global _openrouter_client
+    if _openrouter_client is None:
+        with _lock:
+            if _openrouter_client is None:
+                from openai import OpenAI
+                _openrouter_client = OpenAI(
+                    base_url=os.getenv('OPENROUTER_BASE_URL', "https://openrouter.ai/api/v1"),
+                    api_key=os.getenv('OPENROUTER_API_KEY'),
+                    timeout=OPENROUTER_TIMEOUT
+                )
+    return _openrouter_client
+
+def configure(listings=None, openrouter_client=None):
+    """Use the given objects instead of building real clients"""
+    global _listings, _openrouter_client
+    with _lock:
+        if listings is not None:
+            _listings = listings
+        if openrouter_client is not None:
+            _openrouter_client = openrouter_client
+
+def close():
+    """Close the Mongo client (if one was ever created) and forget all clients"""
+    global _mongo_client, _listings, _openrouter_client
+    with _lock:
+        if _mongo_client is not None:
+            _mongo_client.close()
+        _mongo_client = _listings = _openrouter_client = None
@@ -0,0 +1,164 @@
+"""Local color and pattern features for listing images (no model call)
+
+The image is shrunk to a small thumbnail, the plain photo background is
+masked out using the border pixels, and every remaining pixel is bucketed
+into a named color with vectorized HSV rules. From that we keep:
+
+- color_hist: share of each name in COLOR_NAMES (fixed order)
+- palette: up to three [r, g, b, share] entries, most dominant first
+- texture: edge density, anisotropy, colorfulness and brightness
+- color_names / pattern: short labels the server can filter on
+"""
+import io
+
+# NumPy and Pillow are imported on first use so the API server, which only
+# needs COLOR_NAMES and color_similarity, starts without them
+np = None
+Image = None
+
+# Bump when the extraction changes so --features-only recomputes
+FEATURE_VERSION = 1
+
+COLOR_NAMES = ['black', 'white', 'gray', 'beige', 'brown', 'red', 'orange',
+               'yellow', 'green', 'blue', 'navy', 'purple', 'pink']
+
+# Minimum share of the garment for a color to be listed in color_names
+COLOR_NAME_MIN_SHARE = 0.12
+
+THUMB_SIZE = 64
+
+
+def _load_imaging():
+    """Import NumPy and Pillow; False if either is missing (features are skipped)"""
+    global np, Image
+    if np is None:
+        try:
+            import numpy
+            from PIL import Image as PILImage
+        except ImportError:
+            return False
+        np, Image = numpy, PILImage
+    return True
+
+def _hsv(rgb):
+    """(N, 3) floats in 0-1 -> hue in degrees, saturation, value"""
+    maxc = rgb.max(axis=1)
+    minc = rgb.min(axis=1)
+    delta = maxc - minc
+    safe = np.where(delta == 0, 1, delta)
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    hue = np.select(
+        [maxc == r, maxc == g],
+        [((g - b) / safe) % 6, (b - r) / safe + 2],
+        (r - g) / safe + 4
+    ) * 60
+    hue = np.where(delta == 0, 0, hue)
+    saturation = np.where(maxc == 0, 0, delta / np.where(maxc == 0, 1, maxc))
+    return hue, saturation, maxc
+
+def color_labels(rgb):
+    """Index into COLOR_NAMES for every pixel"""
+    hue, sat, val = _hsv(rgb)
+    conditions = [
+        val < 0.2,
+        (sat < 0.15) & (val > 0.85),
+        sat < 0.15,
+        (hue >= 20) & (hue < 50) & (sat < 0.35) & (val > 0.6),
+        (hue >= 10) & (hue < 45) & (val < 0.6),
+        ((hue < 15) | (hue >= 345)) & ~((sat < 0.5) & (val > 0.7)),
+        (hue >= 15) & (hue < 40),
+        (hue >= 40) & (hue < 70),
+        (hue >= 70) & (hue < 170),
+        (hue >= 170) & (hue < 255) & (val >= 0.45),
+        (hue >= 170) & (hue < 255),
+        (hue >= 255) & (hue < 290),
+    ]
+    choices = [COLOR_NAMES.index(name) for name in
+               ('black', 'white', 'gray', 'beige', 'brown', 'red', 'orange',
+                'yellow', 'green', 'blue', 'navy', 'purple')]
+    return np.select(conditions, choices, COLOR_NAMES.index('pink'))
+
+def _foreground_mask(pixels):
+    """Mask of pixels that differ from the (border-estimated) background"""
+    border = np.concatenate([pixels[0], pixels[-1], pixels[:, 0], pixels[:, -1]])
+    background = np.median(border, axis=0)
+    distance = np.abs(pixels - background).sum(axis=2)
+    mask = distance > 0.12
+    # Busy backgrounds or full-bleed photos: keep everything
+    if mask.mean() < 0.2:
+        return np.ones(mask.shape, dtype=bool)
+    return mask
+
+def extract_features(content):
+    """Feature dict for raw image bytes (None if undecodable or NumPy is missing)"""
+    if not content or not _load_imaging():
+        return None
+    try:
+        img = Image.open(io.BytesIO(content)).convert('RGB')
+        img.thumbnail((THUMB_SIZE, THUMB_SIZE))
+    except Exception:
+        return None
+
+    pixels = np.asarray(img, dtype=np.float32) / 255.0
+    if pixels.shape[0] < 3 or pixels.shape[1] < 3:
+        return None
+    mask = _foreground_mask(pixels)
+    garment = pixels[mask]
+
+    labels = color_labels(garment)
+    counts = np.bincount(labels, minlength=len(COLOR_NAMES))
+    hist = counts / counts.sum()
+
+    palette = []
+    for index in np.argsort(counts)[::-1][:3]:
+        if counts[index] == 0:
+            break
+        mean_rgb = garment[labels == index].mean(axis=0) * 255
+        palette.append([int(round(c)) for c in mean_rgb] + [round(float(hist[index]), 3)])
+
+    # Texture from grayscale gradients, inside the garment only
+    gray = pixels @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    dx = np.abs(np.diff(gray, axis=1))[:-1, :]
+    dy = np.abs(np.diff(gray, axis=0))[:, :-1]
+    inner = mask[:-1, :-1]
+    dx, dy = dx[inner], dy[inner]
+    edge_density = float(((dx + dy) > 0.15).mean()) if dx.size else 0.0
+    energy_x, energy_y = float(dx.sum()), float(dy.sum())
+    anisotropy = abs(energy_x - energy_y) / (energy_x + energy_y) if energy_x + energy_y else 0.0
+
+    # Hasler & Suesstrunk colorfulness
+    rg = garment[:, 0] - garment[:, 1]
+    yb = 0.5 * (garment[:, 0] + garment[:, 1]) - garment[:, 2]
+    colorfulness = float(np.hypot(rg.std(), yb.std()) + 0.3 * np.hypot(rg.mean(), yb.mean()))
+
+    color_names = [COLOR_NAMES[i] for i in np.argsort(hist)[::-1][:3] if hist[i] >= COLOR_NAME_MIN_SHARE]
+    if edge_density < 0.08 and hist.max() > 0.6:
+        pattern = 'solid'
+    elif anisotropy > 0.45 and edge_density >= 0.08:
+        pattern = 'striped'
+    elif len(color_names) >= 3 or colorfulness > 0.45:
+        pattern = 'multicolor'
+    else:
+        pattern = 'textured' if edge_density >= 0.2 else 'solid'
+
+    return {
+        'version': FEATURE_VERSION,
+        'color_hist': [round(float(share), 3) for share in hist],
+        'palette': palette,
+        'texture': {
+            'edge_density': round(edge_density, 3),
+            'anisotropy': round(anisotropy, 3),
+            'colorfulness': round(colorfulness, 3),
+            'brightness': round(float(gray[mask].mean()), 3)
+        },
+        'color_names': color_names,
+        'pattern': pattern
+    }
+
+def color_similarity(hist_a, hist_b):
+    """Cosine similarity of two color_hist vectors (0 if either is missing)"""
+    if not hist_a or not hist_b:
+        return 0.0
+    dot = sum(a * b for a, b in zip(hist_a, hist_b))
+    norm = (sum(a * a for a in hist_a) ** 0.5) * (sum(b * b for b in hist_b) ** 0.5)
+    return dot / norm if norm else 0.0
@@ -0,0 +1,304 @@
+"""Browserless Depop fetching: pooled HTTP plus the page's embedded JSON state
+
+Search and product pages ship their data as JSON (Next.js __NEXT_DATA__ and
+schema.org ld+json) alongside the markup, so we can skip rendering entirely.
+Every parse_* function takes raw HTML, so saved pages work as fixtures
+(fixtures/, checked by check_fixtures.py).
+The fetch_* functions return None when the fast path can't produce data,
+which is the caller's cue to fall back to Selenium.
+"""
+import json
+import os
+import re
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEPOP_URL = 'https://www.depop.com'
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9'
+}
+
+# Connections kept open per host; sized for the scraper worker pools
+POOL_SIZE = int(os.getenv('DEPOP_HTTP_POOL', '16'))
+
+NEXT_DATA_RE = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.DOTALL)
+LD_JSON_RE = re.compile(r'<script[^>]*type="application/ld\+json"[^>]*>(.*?)</script>', re.DOTALL)
+
+_session = None
+
+
+def get_session():
+    """Shared keep-alive session with retries on transient errors"""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _session = session
+    return _session
+
+def fetch_html(url, timeout=10):
+    """GET a page and return its HTML, or None"""
+    try:
+        response = get_session().get(url, timeout=timeout)
+    except requests.RequestException as e:
+        print(f"    ⚠️ HTTP fetch failed for {url}: {e}")
+        return None
+    if response.status_code != 200:
+        return None
+    return response.text
+
+# ===== EMBEDDED JSON =====
+
+def extract_next_data(html):
+    """The page's __NEXT_DATA__ JSON, or None"""
+    match = NEXT_DATA_RE.search(html or '')
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return None
+
+def extract_ld_json(html):
+    """All schema.org ld+json objects on the page (flattened)"""
+    objects = []
+    for match in LD_JSON_RE.finditer(html or ''):
+        try:
+            data = json.loads(match.group(1))
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict) and '@graph' in data:
+            data = data['@graph']
+        objects.extend(data if isinstance(data, list) else [data])
+    return objects
+
+def _walk(data):
+    """Yield every dict nested anywhere in a JSON value"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            yield value
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(reversed(value))
+
+def _looks_like_product(obj):
+    return (
+        isinstance(obj.get('slug'), str)
+        and any(key in obj for key in ('pricing', 'price'))
+        and any(key in obj for key in ('pictures', 'preview', 'pictures_data', 'pictures_urls', 'images'))
+    )
+
+def parse_price(value):
+    """Best-effort float from the many shapes Depop uses for prices"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        price_str = re.sub(r'[^\d.]', '', value)
+        try:
+            return float(price_str) if price_str else 0.0
+        except ValueError:
+            return 0.0
+    if isinstance(value, dict):
+        # Prefer what the buyer pays now over the original price
+        for key in ('current_price', 'discounted_price', 'total_price', 'price_amount', 'amount',
+                    'priceAmount', 'original_price', 'price_breakdown', 'price'):
+            if key in value:
+                price = parse_price(value[key])
+                if price:
+                    return price
+    return 0.0
+
+def _largest_image(obj):
+    """Pick the biggest picture URL out of a product's picture fields"""
+    for key in ('preview', 'pictures', 'pictures_data', 'pictures_urls', 'images'):
+        value = obj.get(key)
+        if isinstance(value, list) and value:
+            value = value[0]
+        if isinstance(value, str):
+            return value.replace('/medium/', '/large/')
+        if isinstance(value, dict):
+            sized = {}
+            for size, url in value.items():
+                if isinstance(url, dict):
+                    url = url.get('url')
+                digits = re.sub(r'\D', '', str(size))
+                if isinstance(url, str) and digits:
+                    sized[int(digits)] = url
+            if sized:
+                return sized[max(sized)]
+            for url in value.values():
+                if isinstance(url, str) and url.startswith('http'):
+                    return url.replace('/medium/', '/large/')
+    return ''
+
+def _size(obj):
+    sizes = obj.get('sizes') or obj.get('size')
+    if isinstance(sizes, list):
+        sizes = [s.get('name', '') if isinstance(s, dict) else str(s) for s in sizes]
+        sizes = [s for s in sizes if s]
+        return ', '.join(sizes) if sizes else 'N/A'
+    if isinstance(sizes, dict):
+        return sizes.get('name', 'N/A')
+    return str(sizes) if sizes else 'N/A'
+
+def _name(obj):
+    for key in ('title', 'name', 'brand_name', 'brandName'):
+        if isinstance(obj.get(key), str) and obj[key].strip():
+            return obj[key].strip()
+    description = obj.get('description')
+    if isinstance(description, str) and description.strip():
+        return description.strip().splitlines()[0][:80]
+    return obj['slug'].replace('-', ' ')
+
+def product_from_json(obj, category):
+    """Normalize one embedded product object to the listings schema"""
+    slug = obj['slug']
+    return {
+        'name': _name(obj),
+        'url': f"{DEPOP_URL}/products/{slug}/",
+        'image': _largest_image(obj),
+        'price': parse_price(obj.get('pricing', obj.get('price'))),
+        'size': _size(obj),
+        'category': category
+    }
+
+# ===== PAGE PARSERS =====
+
+def parse_search_html(html, category):
+    """Listings from a search page's embedded state ([] if there is none)"""
+    data = extract_next_data(html)
+    if data is None:
+        return []
+
+    products = []
+    seen = set()
+    for obj in _walk(data):
+        if _looks_like_product(obj) and obj['slug'] not in seen:
+            seen.add(obj['slug'])
+            product = product_from_json(obj, category)
+            if product['image']:
+                products.append(product)
+    return products
+
+def has_listing_essentials(details):
+    """True if parsed details carry an image URL and a price (otherwise render the page)"""
+    image = details.get('image') or ''
+    return image.startswith('http') and (details.get('price') or 0) > 0
+
+def parse_product_html(html):
+    """Product page details (name, brand, size, price, image), or None
+
+    JSON-LD is tried first; if it lacks an image or price the page's
+    __NEXT_DATA__ gets a chance before the partial JSON-LD record is used.
+    """
+    partial = None
+    for obj in extract_ld_json(html):
+        if isinstance(obj, dict) and obj.get('@type') == 'Product':
+            offers = obj.get('offers') or {}
+            if isinstance(offers, list):
+                offers = offers[0] if offers else {}
+            brand = obj.get('brand') or 'Various'
+            if isinstance(brand, dict):
+                brand = brand.get('name') or 'Various'
+            image = obj.get('image') or ''
+            if isinstance(image, list):
+                image = image[0] if image else ''
+            details = {
+                'name': obj.get('name') or 'Unknown Item',
+                'brand': brand,
+                'size': _size(obj) if 'size' in obj or 'sizes' in obj else 'Various',
+                'price': parse_price(offers.get('price', 0)),
+                'image': image.replace('/medium/', '/large/') if isinstance(image, str) else ''
+            }
+            if has_listing_essentials(details):
+                return details
+            partial = details
+            break
+
+    data = extract_next_data(html)
+    if data is None:
+        return partial
+    for obj in _walk(data):
+        if _looks_like_product(obj):
+            product = product_from_json(obj, None)
+            brand = obj.get('brand_name') or obj.get('brand') or 'Various'
+            return {
+                'name': product['name'],
+                'brand': brand if isinstance(brand, str) else 'Various',
+                'size': product['size'] if product['size'] != 'N/A' else 'Various',
+                'price': product['price'],
+                'image': product['image']
+            }
+    return partial
+
+def parse_listing_status(html):
+    """'sold' or 'live' from a product page's embedded data
+
+    None when the page has no product data at all (a bot challenge or
+    interstitial), so the listing counts as unchecked rather than live.
+    """
+    for obj in extract_ld_json(html):
+        if isinstance(obj, dict) and obj.get('@type') == 'Product':
+            offers = obj.get('offers') or {}
+            if isinstance(offers, list):
+                offers = offers[0] if offers else {}
+            availability = str(offers.get('availability', ''))
+            if 'SoldOut' in availability or 'OutOfStock' in availability:
+                return 'sold'
+            return 'live'
+
+    data = extract_next_data(html)
+    for obj in _walk(data or {}):
+        if _looks_like_product(obj):
+            status = str(obj.get('status', '')).lower()
+            if obj.get('sold') is True or status in ('sold', 'deleted', 'removed'):
+                return 'sold'
+            return 'live'
+    return None
+
+# ===== FETCHERS =====
+
+def fetch_search_listings(url, category):
+    """Listings for a search URL over plain HTTP, or None to fall back to a browser"""
+    html = fetch_html(url)
+    if html is None:
+        return None
+    products = parse_search_html(html, category)
+    return products or None
+
+def fetch_product_details(product_url):
+    """Product details over plain HTTP, or None to fall back to a browser
+
+    Pages whose embedded data lacks an image or a price count as a miss,
+    so a partial parse never replaces the rendered page.
+    """
+    html = fetch_html(product_url)
+    if html is None:
+        return None
+    details = parse_product_html(html)
+    if not details or not has_listing_essentials(details):
+        return None
+    return details
+
+def fetch_listing_status(product_url):
+    """'live', 'sold' or 'removed' for a product page, or None if it couldn't be checked"""
+    try:
+        response = get_session().get(product_url, timeout=10)
+    except requests.RequestException:
+        return None
+    if response.status_code in (404, 410):
+        return 'removed'
+    if response.status_code != 200:
+        return None
+    return parse_listing_status(response.text)
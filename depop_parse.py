@@ -0,0 +1,82 @@
+"""Card-scoped extraction of products from rendered Depop search pages
+
+Each product card is located once via its /products/ link and every field
+(image, price, size, name) is read from inside that card, so a card with a
+missing field can't shift values onto its neighbours.
+"""
+import re
+
+from bs4 import BeautifulSoup
+
+from depop_http import DEPOP_URL, parse_price
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:  # stdlib parser is much slower but always there
+    HTML_PARSER = 'html.parser'
+
+PRICE_SELECTOR = '.styles_price__H8qdh:not(.styles_discountedFullPrice__JTi1d)'
+SIZE_SELECTOR = '.styles_sizeAttributeText__r9QJj'
+NAME_SELECTOR = '.styles_productAttributes__nt3TO > p:last-child'
+
+PRODUCT_HREF = re.compile(r'/products/')
+
+
+def _card_image(card):
+    for img in card.find_all('img'):
+        img_url = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
+        if img_url and 'media-photos.depop.com/b1/' in img_url and 'P8' in img_url:
+            return img_url.replace('/medium/', '/large/')
+    return None
+
+def _product_urls(element, limit=8):
+    """Distinct /products/ hrefs under element (stops looking after limit links)"""
+    return {a.get('href') for a in element.find_all('a', href=PRODUCT_HREF, limit=limit)}
+
+def _card_root(link):
+    """Largest ancestor of link that holds no other product's link
+
+    Falls back to the link itself when even its parent is shared with other
+    cards (flat grids), so fields are never read from a neighbour.
+    """
+    card = link
+    for parent in link.parents:
+        if parent.name in (None, '[document]') or len(_product_urls(parent)) != 1:
+            break
+        card = parent
+    return card
+
+def _text(card, selector):
+    elem = card.select_one(selector)
+    return elem.text.strip() if elem else 'N/A'
+
+def iter_cards(html, category, parser=HTML_PARSER):
+    """Yield one complete product record per card on the page"""
+    soup = BeautifulSoup(html, parser)
+    seen = set()
+
+    for link in soup.select('a[href*="/products/"]'):
+        href = link.get('href')
+        product_url = href if href.startswith('http') else DEPOP_URL + href
+        if product_url in seen:
+            continue
+
+        card = _card_root(link)
+        img_url = _card_image(card)
+        if not img_url:
+            continue
+        seen.add(product_url)
+
+        yield {
+            'name': _text(card, NAME_SELECTOR),
+            'url': product_url,
+            'image': img_url,
+            'price': parse_price(_text(card, PRICE_SELECTOR)),
+            'size': _text(card, SIZE_SELECTOR),
+            'category': category
+        }
+
+def extract_cards(html, category, parser=HTML_PARSER):
+    """All product records on a rendered search page"""
+    return list(iter_cards(html, category, parser))
@@ -0,0 +1,181 @@
+"""In-memory stand-in for a pymongo collection, for local benchmarks
+
+Only supports the query and update operators the ThriftTinder scripts use.
+"""
+import copy
+import random
+import threading
+
+from bson import ObjectId
+
+CATEGORIES = ["mens_shirts", "mens_jeans", "womens_tops", "womens_skirts"]
+
+
+def _get(doc, key):
+    """Dotted-path lookup; returns (found, value)"""
+    value = doc
+    for part in key.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return False, None
+        value = value[part]
+    return True, value
+
+def _matches_condition(found, value, condition):
+    if not isinstance(condition, dict) or not any(k.startswith('$') for k in condition):
+        if isinstance(value, list) and not isinstance(condition, list):
+            return condition in value
+        return found and value == condition
+
+    values = value if isinstance(value, list) else [value]
+    for op, arg in condition.items():
+        if op == '$exists':
+            if bool(arg) != found:
+                return False
+        elif op == '$ne':
+            if found and (arg in values if isinstance(value, list) else value == arg):
+                return False
+        elif op == '$in':
+            if not found or not any(v in arg for v in values):
+                return False
+        elif op == '$nin':
+            if found and any(v in arg for v in values):
+                return False
+        elif op == '$all':
+            if not found or not all(a in values for a in arg):
+                return False
+        elif op in ('$gt', '$gte', '$lt', '$lte'):
+            if not found or value is None:
+                return False
+            try:
+                ok = {'$gt': value > arg, '$gte': value >= arg, '$lt': value < arg, '$lte': value <= arg}[op]
+            except TypeError:
+                return False
+            if not ok:
+                return False
+        else:
+            raise NotImplementedError(f"fake_mongo does not support {op}")
+    return True
+
+def matches(doc, query):
+    """True if doc satisfies a (simple) Mongo query"""
+    for key, condition in (query or {}).items():
+        if key == '$or':
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif key == '$and':
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        else:
+            found, value = _get(doc, key)
+            if not _matches_condition(found, value, condition):
+                return False
+    return True
+
+def _project(doc, projection):
+    if not projection:
+        return copy.deepcopy(doc)
+    included = {k for k, v in projection.items() if v}
+    if included:
+        result = {k: copy.deepcopy(v) for k, v in doc.items() if k in included}
+        if projection.get('_id', 1):
+            result['_id'] = doc['_id']
+        return result
+    excluded = {k for k, v in projection.items() if not v}
+    return {k: copy.deepcopy(v) for k, v in doc.items() if k not in excluded}
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def limit(self, n):
+        if n:
+            self._docs = self._docs[:n]
+        return self
+
+    def __iter__(self):
+        return iter(self._docs)
+
+
+class _Result:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class FakeCollection:
+    """Thread-safe, in-memory subset of pymongo's Collection API"""
+
+    def __init__(self, docs=None):
+        self._docs = {}
+        self._lock = threading.Lock()
+        for doc in docs or []:
+            self.insert_one(doc)
+
+    def insert_one(self, doc):
+        with self._lock:
+            doc.setdefault('_id', ObjectId())
+            self._docs[doc['_id']] = copy.deepcopy(doc)
+        return _Result(inserted_id=doc['_id'])
+
+    def insert_many(self, docs):
+        return _Result(inserted_ids=[self.insert_one(doc).inserted_id for doc in docs])
+
+    def find(self, query=None, projection=None):
+        with self._lock:
+            docs = [_project(doc, projection) for doc in self._docs.values() if matches(doc, query)]
+        return FakeCursor(docs)
+
+    def find_one(self, query=None, projection=None):
+        for doc in self.find(query, projection).limit(1):
+            return doc
+        return None
+
+    def count_documents(self, query):
+        with self._lock:
+            return sum(1 for doc in self._docs.values() if matches(doc, query))
+
+    def update_one(self, query, update, upsert=False):
+        with self._lock:
+            for doc in self._docs.values():
+                if matches(doc, query):
+                    doc.update(copy.deepcopy(update.get('$set', {})))
+                    for key in update.get('$unset', {}):
+                        doc.pop(key, None)
+                    return _Result(matched_count=1, modified_count=1, upserted_id=None)
+
+            if not upsert:
+                return _Result(matched_count=0, modified_count=0, upserted_id=None)
+
+            doc = {k: v for k, v in query.items() if not k.startswith('$') and not isinstance(v, dict)}
+            doc.update(copy.deepcopy(update.get('$setOnInsert', {})))
+            doc.update(copy.deepcopy(update.get('$set', {})))
+            doc.setdefault('_id', ObjectId())
+            self._docs[doc['_id']] = doc
+            return _Result(matched_count=0, modified_count=0, upserted_id=doc['_id'])
+
+    def create_index(self, keys, **kwargs):
+        return str(keys)
+
+
+def seed_listings(count, image_url, duplicate_ratio=0.0, seed=0):
+    """Generate listing documents; image_url is formatted with an image number
+
+    duplicate_ratio of the listings reuse an earlier listing's image number,
+    mimicking the same garment scraped under different URLs.
+    """
+    rng = random.Random(seed)
+    docs = []
+    for i in range(count):
+        image_number = i
+        if i and rng.random() < duplicate_ratio:
+            image_number = rng.randrange(i)
+        docs.append({
+            '_id': ObjectId(),
+            'name': f"Bench item {i}",
+            'url': f"https://www.depop.com/products/bench-item-{i}/",
+            'image': image_url.format(image_number),
+            'price': round(rng.uniform(5, 80), 2),
+            'size': rng.choice(['XS', 'S', 'M', 'L', 'XL']),
+            'category': rng.choice(CATEGORIES)
+        })
+    return docs
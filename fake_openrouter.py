@@ -0,0 +1,219 @@
+"""Local stand-ins for OpenRouter and the Depop image CDN
+
+Speaks just enough of the chat-completions API for the OpenAI client the
+indexer and server use, with configurable latency, error rate and canned
+JSON answers. Run directly to serve both on localhost:
+
+    python fake_openrouter.py --latency 0.8 --error-rate 0.05
+
+then point the scripts at it with OPENROUTER_BASE_URL=http://127.0.0.1:8099/v1
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import io
+import json
+import random
+import re
+import threading
+import time
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:  # images are served as opaque bytes without Pillow
+    Image = None
+
+DEFAULT_CANNED = [
+    {
+        "ai_description": "Faded black band tee with a cracked screen print across the chest. Boxy fit with light wear at the collar.",
+        "tags": ["vintage", "grunge", "band tee", "black", "white", "oversized", "boxy", "distressed"]
+    },
+    {
+        "ai_description": "Light wash straight leg denim with whiskering on the thighs. Classic five pocket cut in good condition.",
+        "tags": ["vintage", "90s", "denim", "light blue", "straight", "relaxed", "classic", "casual"]
+    },
+    {
+        "ai_description": "Pleated plaid mini skirt in red and navy tartan. Crisp pleats and a fitted waist.",
+        "tags": ["preppy", "y2k", "plaid", "red", "navy", "mini", "pleated", "fitted"]
+    }
+]
+
+LISTING_ID_RE = re.compile(r'Listing ID: ([0-9a-f]{24})')
+
+
+class FakeOpenRouter:
+    """Configuration and counters shared by the request handlers"""
+
+    def __init__(self, latency=0.5, jitter=0.1, error_rate=0.0, canned=None, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.canned = canned or DEFAULT_CANNED
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def answer(self, messages):
+        """Build the assistant reply for a request (one object or a batch array)"""
+        text = ""
+        for message in messages:
+            content = message.get('content')
+            if isinstance(content, str):
+                text += content
+            else:
+                text += "".join(part.get('text', '') for part in content if part.get('type') == 'text')
+
+        listing_ids = list(dict.fromkeys(LISTING_ID_RE.findall(text)))
+        with self.lock:
+            if listing_ids:
+                return json.dumps([dict(self.rng.choice(self.canned), id=listing_id) for listing_id in listing_ids])
+            return json.dumps(self.rng.choice(self.canned))
+
+    def should_fail(self):
+        with self.lock:
+            self.requests += 1
+            failed = self.rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return failed
+
+    def delay(self):
+        with self.lock:
+            seconds = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        time.sleep(seconds)
+
+
+def _make_chat_handler(fake):
+    class ChatHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self._send_json(404, {'error': {'message': 'not found'}})
+                return
+
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+
+            fake.delay()
+            if fake.should_fail():
+                self._send_json(500, {'error': {'message': 'fake upstream error', 'code': 500}})
+                return
+
+            content = fake.answer(request.get('messages', []))
+            self._send_json(200, {
+                'id': f"gen-fake-{int(time.time() * 1000)}",
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': request.get('model', 'fake'),
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content},
+                    'finish_reason': 'stop'
+                }],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+            })
+
+    return ChatHandler
+
+
+def render_image(number, size=320):
+    """Deterministic JPEG bytes for an image number"""
+    if Image is None:
+        return f"fake-image-{number}".encode('utf-8') * 64
+
+    rng = random.Random(number)
+    img = Image.new('RGB', (size, size), tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(6):
+        x0, y0 = rng.randrange(size), rng.randrange(size)
+        x1, y1 = x0 + rng.randrange(20, size // 2), y0 + rng.randrange(20, size // 2)
+        draw.rectangle([x0, y0, x1, y1], fill=tuple(rng.randrange(256) for _ in range(3)))
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=85)
+    return buffer.getvalue()
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    """Serves /images/<n>.jpg"""
+    cache = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        match = re.match(r'^/images/(\d+)\.jpg$', self.path)
+        if not match:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        number = int(match.group(1))
+        if number not in self.cache:
+            self.cache[number] = render_image(number)
+        body = self.cache[number]
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def start_fake_openrouter(fake=None, host='127.0.0.1', port=0):
+    """Start the chat-completions stand-in in a background thread
+
+    Returns (server, base_url) where base_url is what the OpenAI client wants.
+    """
+    fake = fake or FakeOpenRouter()
+    server = _serve(ThreadingHTTPServer((host, port), _make_chat_handler(fake)))
+    server.fake = fake
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+def start_image_server(host='127.0.0.1', port=0):
+    """Start the image stand-in; returns (server, url_template) for seed_listings"""
+    server = _serve(ThreadingHTTPServer((host, port), ImageHandler))
+    return server, f"http://{host}:{server.server_address[1]}/images/{{}}.jpg"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fake OpenRouter + image server")
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--image-port', type=int, default=8098)
+    parser.add_argument('--latency', type=float, default=0.5, help="Seconds per completion")
+    parser.add_argument('--jitter', type=float, default=0.1)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument('--canned', help="JSON file with a list of {ai_description, tags} answers")
+    args = parser.parse_args()
+
+    canned = None
+    if args.canned:
+        with open(args.canned) as f:
+            canned = json.load(f)
+
+    fake = FakeOpenRouter(args.latency, args.jitter, args.error_rate, canned)
+    chat_server, base_url = start_fake_openrouter(fake, port=args.port)
+    image_server, image_url = start_image_server(port=args.image_port)
+
+    print(f"🤖 Fake OpenRouter at {base_url}")
+    print(f"📸 Fake images at {image_url.format('<n>')}")
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        chat_server.shutdown()
+        image_server.shutdown()
@@ -0,0 +1,105 @@
+"""Resized listing images on local disk, served by the /api/images proxy
+
+Variants are generated at index time (the indexer already has the bytes)
+or on the first request for them, then served straight from disk.
+"""
+import hashlib
+import io
+import os
+import threading
+
+import requests
+
+try:
+    from PIL import Image
+except ImportError:  # without Pillow the proxy redirects to the original image
+    Image = None
+
+CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', 'image_cache')
+
+# Longest edge in pixels for each variant
+VARIANTS = {
+    'thumb': 320,
+    'medium': 640
+}
+
+# Bump to invalidate every cached variant (and its ETag)
+VARIANT_VERSION = 1
+
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def variant_path(listing_id, variant):
+    return os.path.join(CACHE_DIR, variant, f"{listing_id}.jpg")
+
+def variant_etag(image_url, variant):
+    """Strong ETag derived from the source image and variant settings"""
+    key = f"{image_url}|{variant}|{VARIANTS[variant]}|{VARIANT_VERSION}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def proxy_url(listing_id, variant):
+    return f"/api/images/{listing_id}/{variant}.jpg"
+
+def add_image_variants(listing):
+    """Point a listing payload at the proxy's thumbnail and medium images"""
+    listing_id = str(listing['_id'])
+    listing['thumbnail'] = proxy_url(listing_id, 'thumb')
+    listing['image_medium'] = proxy_url(listing_id, 'medium')
+    return listing
+
+def _write_variant(content, listing_id, variant):
+    img = Image.open(io.BytesIO(content))
+    img = img.convert('RGB')
+    img.thumbnail((VARIANTS[variant], VARIANTS[variant]))
+
+    path = variant_path(listing_id, variant)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    img.save(tmp_path, format='JPEG', quality=80, optimize=True, progressive=True)
+    os.replace(tmp_path, path)
+    return path
+
+def generate_variants(listing_id, content):
+    """Write every variant for a listing from its original image bytes"""
+    if Image is None or not content:
+        return False
+    try:
+        for variant in VARIANTS:
+            _write_variant(content, listing_id, variant)
+        return True
+    except Exception as e:
+        print(f"  ⚠️ Could not generate image variants for {listing_id}: {e}")
+        return False
+
+def ensure_variant(listing_id, image_url, variant):
+    """Path to a cached variant, generating it on first use
+
+    None if it can't be made (no Pillow, origin unreachable, undecodable
+    image); the caller then redirects to the original.
+    """
+    path = variant_path(listing_id, variant)
+    if os.path.exists(path):
+        return path
+    if Image is None or not image_url:
+        return None
+
+    # One download per listing even if many clients ask at once
+    with _locks_lock:
+        lock = _locks.setdefault(listing_id, threading.Lock())
+    with lock:
+        if os.path.exists(path):
+            return path
+        try:
+            response = requests.get(image_url, timeout=10)
+            if response.status_code != 200:
+                return None
+            # Undecodable images are logged and skipped inside generate_variants
+            generate_variants(listing_id, response.content)
+        except requests.RequestException as e:
+            print(f"  ⚠️ Could not fetch original image for {listing_id}: {e}")
+            return None
+        finally:
+            with _locks_lock:
+                _locks.pop(listing_id, None)
+    return path if os.path.exists(path) else None
@@ -0,0 +1,78 @@
+"""Perceptual image hashing for spotting the same garment under different URLs"""
+import io
+import os
+import threading
+
+try:
+    from PIL import Image
+except ImportError:  # hashing is skipped without Pillow
+    Image = None
+
+# Max differing bits (out of 64) for two images to count as the same item
+MAX_DISTANCE = int(os.getenv('DEDUP_MAX_DISTANCE', '6'))
+
+
+def dhash(content, hash_size=8):
+    """Difference hash of raw image bytes as a 16-char hex string (None if undecodable)"""
+    if Image is None or not content:
+        return None
+    try:
+        img = Image.open(io.BytesIO(content)).convert('L').resize((hash_size + 1, hash_size))
+    except Exception:
+        return None
+
+    pixels = list(img.getdata())
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f"{bits:016x}"
+
+def hamming(a, b):
+    """Number of differing bits between two hex hashes"""
+    return bin(int(a, 16) ^ int(b, 16)).count('1')
+
+
+class HashIndex:
+    """In-memory near-duplicate lookup over 64-bit hashes
+
+    Hashes are split into bands; any two hashes within MAX_DISTANCE bits
+    share at least one identical band when there are more bands than
+    allowed differing bits, so only same-band candidates are compared.
+    """
+
+    def __init__(self, max_distance=MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = -(-64 // self.bands)
+        self.buckets = {}
+        self.entries = {}
+        self._lock = threading.Lock()
+
+    def _keys(self, value):
+        mask = (1 << self.band_bits) - 1
+        return [(band, (value >> (band * self.band_bits)) & mask) for band in range(self.bands)]
+
+    def add(self, image_hash, listing_id):
+        """Register a hash for a listing"""
+        value = int(image_hash, 16)
+        with self._lock:
+            self.entries[listing_id] = value
+            for key in self._keys(value):
+                self.buckets.setdefault(key, set()).add(listing_id)
+
+    def find(self, image_hash):
+        """Return the closest listing ID within max_distance, or None"""
+        value = int(image_hash, 16)
+        best_id, best_distance = None, self.max_distance + 1
+        with self._lock:
+            for key in self._keys(value):
+                for listing_id in self.buckets.get(key, ()):
+                    distance = bin(value ^ self.entries[listing_id]).count('1')
+                    if distance < best_distance:
+                        best_id, best_distance = listing_id, distance
+        return best_id
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,172 @@
+"""Long-running indexer: enhances new listings as the scrapers insert them
+
+Listing IDs arrive through the SQLite queue in index_queue.py (filled by the
+scrapers) and, with --change-stream, from a MongoDB change stream on the
+listings collection. Items are processed with bounded concurrency and the
+queue is acked only after the listing has been written back.
+
+    python index_daemon.py --workers 4 --batch-size 4
+"""
+import argparse
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from bson import ObjectId
+
+import indexer
+from clients import get_listings
+from index_queue import IndexQueue, QUEUE_PATH
+
+# Give up on a listing after this many claims
+MAX_ATTEMPTS = 3
+
+# Seconds before the first retry of a failed listing; doubles per attempt,
+# so a short provider outage doesn't burn through every attempt
+RETRY_BACKOFF = 30
+
+
+class IndexDaemon:
+    def __init__(self, queue, workers=4, batch_size=1, poll_interval=1.0, stats_interval=30):
+        self.queue = queue
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = poll_interval
+        self.stats_interval = stats_interval
+        self.stop_event = threading.Event()
+        self.hash_index = indexer.load_hash_index()
+        self.ai_cache = {}
+        self.lock = threading.Lock()
+        self.metrics = {'enhanced': 0, 'duplicates': 0, 'failed': 0, 'skipped': 0, 'lag': []}
+
+    def stop(self, *_):
+        if not self.stop_event.is_set():
+            print("\n🛑 Shutting down after in-flight items finish...")
+        self.stop_event.set()
+
+    def backfill(self):
+        """Queue anything inserted while the daemon was down"""
+        missing = [doc['_id'] for doc in get_listings().find({'ai_description': {'$exists': False}}, {'_id': 1})]
+        self.queue.enqueue(missing)
+        if missing:
+            print(f"📬 Backfilled {len(missing)} unenhanced listings into the queue")
+
+    def watch_inserts(self):
+        """Feed inserted listing IDs from a MongoDB change stream into the queue"""
+        resume_token = None
+        while not self.stop_event.is_set():
+            try:
+                with get_listings().watch(
+                    [{'$match': {'operationType': 'insert'}}],
+                    resume_after=resume_token,
+                    max_await_time_ms=1000
+                ) as stream:
+                    print("👀 Watching listings change stream")
+                    while not self.stop_event.is_set():
+                        change = stream.try_next()
+                        if change is None:
+                            continue
+                        resume_token = stream.resume_token
+                        self.queue.enqueue([change['documentKey']['_id']])
+            except Exception as e:
+                print(f"⚠️ Change stream unavailable ({e}); relying on the queue")
+                return
+
+    def process(self, entries):
+        """Enhance a claimed batch and ack/release its queue entries"""
+        ids = [ObjectId(listing_id) for listing_id, _, _ in entries]
+        docs = {doc['_id']: doc for doc in get_listings().find({'_id': {'$in': ids}})}
+
+        todo = []
+        for listing_id, enqueued_at, attempt in entries:
+            doc = docs.get(ObjectId(listing_id))
+            if doc is None or 'ai_description' in doc:
+                # Deleted, or enhanced by someone else in the meantime
+                self.queue.ack(listing_id)
+                with self.lock:
+                    self.metrics['skipped'] += 1
+                continue
+            todo.append((doc, enqueued_at, attempt))
+
+        if not todo:
+            return
+
+        outcome = indexer.process_batch([doc for doc, _, _ in todo], self.hash_index, self.ai_cache)
+        now = time.time()
+
+        with self.lock:
+            for doc, enqueued_at, attempt in todo:
+                result = outcome['items'].get(doc['_id'], 'failed')
+                if result == 'failed' and attempt < MAX_ATTEMPTS:
+                    self.queue.release(str(doc['_id']), RETRY_BACKOFF * 2 ** (attempt - 1))
+                else:
+                    self.queue.ack(str(doc['_id']))
+                self.metrics[result] += 1
+                if result != 'failed':
+                    self.metrics['lag'].append(now - enqueued_at)
+
+    def report(self):
+        with self.lock:
+            lag = sorted(self.metrics['lag'])
+            self.metrics['lag'] = []
+            counts = {k: v for k, v in self.metrics.items() if k != 'lag'}
+        queue_stats = self.queue.stats()
+        p50 = lag[len(lag) // 2] if lag else 0.0
+        p95 = lag[min(len(lag) - 1, int(len(lag) * 0.95))] if lag else 0.0
+        print(f"📊 enhanced={counts['enhanced']} dup={counts['duplicates']} failed={counts['failed']} "
+              f"skipped={counts['skipped']} | queue depth={queue_stats['depth']} "
+              f"oldest={queue_stats['oldest_age']:.0f}s | lag p50={p50:.1f}s p95={p95:.1f}s")
+
+    def run(self, change_stream=False):
+        self.backfill()
+        if change_stream:
+            threading.Thread(target=self.watch_inserts, daemon=True).start()
+
+        print(f"🚀 Index daemon running with {self.workers} workers, batch size {self.batch_size}")
+        last_report = time.time()
+        in_flight = set()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while not self.stop_event.is_set():
+                # Only claim what the pool can start right away
+                free = self.workers - len(in_flight)
+                entries = self.queue.claim(free * self.batch_size) if free > 0 else []
+                for start in range(0, len(entries), self.batch_size):
+                    in_flight.add(pool.submit(self.process, entries[start:start + self.batch_size]))
+
+                if in_flight:
+                    done, in_flight = wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future.exception():
+                            print(f"❌ Worker error: {future.exception()}")
+                    in_flight = set(in_flight)
+                else:
+                    self.stop_event.wait(self.poll_interval)
+
+                if time.time() - last_report >= self.stats_interval:
+                    self.report()
+                    last_report = time.time()
+
+            # Graceful shutdown: let claimed batches finish so they get acked
+            wait(in_flight)
+
+        self.report()
+        self.queue.close()
+        print("👋 Index daemon stopped")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Enhance new listings as they are scraped")
+    parser.add_argument('--workers', type=int, default=4, help="Concurrent batches in flight")
+    parser.add_argument('--batch-size', type=int, default=indexer.BATCH_SIZE, help="Listings per model request")
+    parser.add_argument('--queue', default=QUEUE_PATH, help="SQLite queue file")
+    parser.add_argument('--change-stream', action='store_true', help="Also watch MongoDB inserts (needs a replica set)")
+    parser.add_argument('--poll-interval', type=float, default=1.0)
+    parser.add_argument('--stats-interval', type=float, default=30)
+    args = parser.parse_args()
+
+    daemon = IndexDaemon(IndexQueue(args.queue), args.workers, args.batch_size, args.poll_interval, args.stats_interval)
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    daemon.run(change_stream=args.change_stream)
@@ -0,0 +1,114 @@
+"""Durable SQLite queue of listing IDs waiting for AI enhancement
+
+Scrapers enqueue the IDs they insert; index_daemon.py claims and acks them.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+QUEUE_PATH = os.getenv('INDEX_QUEUE_PATH', 'index_queue.db')
+
+# Claimed entries not acked within this many seconds go back to the queue
+CLAIM_TIMEOUT = 300
+
+
+class IndexQueue:
+    """Small at-least-once work queue on top of one SQLite file"""
+
+    def __init__(self, path=QUEUE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS listing_queue (
+                listing_id TEXT PRIMARY KEY,
+                enqueued_at REAL NOT NULL,
+                claimed_at REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL
+            )
+        """)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(listing_queue)")]
+        if 'available_at' not in columns:  # queue files created before retry backoff
+            self._conn.execute("ALTER TABLE listing_queue ADD COLUMN available_at REAL")
+
+    def enqueue(self, listing_ids):
+        """Add listing IDs (already queued ones are left alone)"""
+        now = time.time()
+        rows = [(str(listing_id), now) for listing_id in listing_ids]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO listing_queue (listing_id, enqueued_at) VALUES (?, ?)", rows
+            )
+
+    def claim(self, limit):
+        """Claim up to limit entries; returns [(listing_id, enqueued_at, attempt)]
+
+        attempt counts this claim, so the first claim of an entry is 1.
+        Released entries aren't claimable until their retry time.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute("""
+                    SELECT listing_id, enqueued_at, attempts + 1 FROM listing_queue
+                    WHERE (claimed_at IS NULL OR claimed_at < ?)
+                      AND (available_at IS NULL OR available_at <= ?)
+                    ORDER BY enqueued_at LIMIT ?
+                """, (now - CLAIM_TIMEOUT, now, limit)).fetchall()
+                self._conn.executemany(
+                    "UPDATE listing_queue SET claimed_at = ?, attempts = attempts + 1 WHERE listing_id = ?",
+                    [(now, row[0]) for row in rows]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return rows
+
+    def ack(self, listing_id):
+        """Remove a finished entry"""
+        with self._lock:
+            self._conn.execute("DELETE FROM listing_queue WHERE listing_id = ?", (str(listing_id),))
+
+    def release(self, listing_id, retry_after=0):
+        """Put a claimed entry back so it is retried, no sooner than retry_after seconds from now"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE listing_queue SET claimed_at = NULL, available_at = ? WHERE listing_id = ?",
+                (time.time() + retry_after, str(listing_id))
+            )
+
+    def stats(self):
+        """Queue depth and age of the oldest pending entry in seconds"""
+        with self._lock:
+            depth, oldest = self._conn.execute(
+                "SELECT COUNT(*), MIN(enqueued_at) FROM listing_queue"
+            ).fetchone()
+        return {
+            'depth': depth,
+            'oldest_age': time.time() - oldest if oldest else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def enqueue_listings(listing_ids, path=QUEUE_PATH):
+    """Convenience for scrapers: queue freshly inserted listings for indexing"""
+    listing_ids = list(listing_ids)
+    if not listing_ids:
+        return
+    try:
+        queue = IndexQueue(path)
+        queue.enqueue(listing_ids)
+        queue.close()
+        print(f"📬 Queued {len(listing_ids)} listings for AI indexing")
+    except Exception as e:
+        print(f"⚠️ Could not queue listings for indexing: {e}")
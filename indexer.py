@@ -1,55 +1,33 @@
-from pymongo import MongoClient
-from openai import OpenAI
 import requests
+import argparse
 import base64
+import hashlib
+import json
+import os
 import time
 from dotenv import load_dotenv
+from image_hash import dhash, HashIndex
+from image_cache import generate_variants
+from color_features import extract_features, FEATURE_VERSION
+from clients import get_listings, get_openrouter_client
 load_dotenv()
 
-# MongoDB connection
-MONGODB_URI = os.getenv('MONGODB_URI')
-client = MongoClient(MONGODB_URI)
-db = client['thrifttinderDB']
-collection = db['listings']
+MODEL = "google/gemini-2.5-flash"
 
-# OpenRouter client
-openrouter_client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=os.getenv('OPENROUTER_API_KEY')
-)
+# Bump when ITEM_PROMPT / BATCH_PROMPT change so --reindex picks items up again
+PROMPT_VERSION = 2
+AI_VERSION = f"{PROMPT_VERSION}:{MODEL}"
 
-def enhance_item_with_ai(item):
-    """Add AI description and tags to a single item"""
-    
-    image_url = item.get('image', '')
-    name = item.get('name', 'Unknown')
-    category = item.get('category', 'Unknown')
-    price = item.get('price', 0)
-    
-    if not image_url:
-        print(f"  ⚠️ No image for {name}, skipping")
-        return None
-    
-    try:
-        # Download and encode image
-        print(f"  📸 Downloading image...")
-        response = requests.get(image_url, timeout=10)
-        if response.status_code != 200:
-            print(f"  ⚠️ Failed to download image")
-            return None
-        
-        image_base64 = base64.b64encode(response.content).decode('utf-8')
-        
-        # Ask Gemini to analyze
-        print(f"  🤖 Asking Gemini for analysis...")
-        completion = openrouter_client.chat.completions.create(
-            model="google/gemini-2.5-flash",
-            messages=[{
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"""Analyze this clothing item from a thrift store listing.
+# Pre-generate the server's thumbnail/medium images from the bytes we download anyway
+GENERATE_IMAGE_VARIANTS = os.getenv('INDEXER_IMAGE_VARIANTS', '1') != '0'
+
+# Compute color/pattern features locally from the downloaded image
+COLOR_FEATURES = os.getenv('INDEXER_COLOR_FEATURES', '1') != '0'
+
+# How many listings to pack into one vision request (1 = one call per item)
+BATCH_SIZE = int(os.getenv('INDEXER_BATCH_SIZE', '1'))
+
+ITEM_PROMPT = """Analyze this clothing item from a thrift store listing.
 
 Item info:
 - Name: {name}
@@ -69,99 +47,553 @@ Return ONLY valid JSON in this exact format (no markdown, no ```json):
 }}
 
 Include 8-12 total tags covering style, colors, and fit. Be specific and accurate based on what you see."""
-                    },
+
+BATCH_PROMPT = """Analyze each of these {count} clothing items from thrift store listings.
+Each item's image follows its "Listing ID" line below.
+
+Items:
+{items_text}
+
+For EACH item provide:
+1. A 2-3 sentence description focusing on visual details (colors, patterns, graphics, style, condition)
+2. Style tags that describe the aesthetic (like: vintage, y2k, grunge, preppy, streetwear, minimal, boho, athletic, etc.)
+3. Color tags (main colors visible)
+4. Fit/type tags (like: oversized, cropped, fitted, baggy, mini, midi, ripped, distressed, etc.)
+
+Return ONLY a valid JSON array with one object per listing, in this exact format (no markdown, no ```json):
+[
+  {{
+    "id": "listing id here",
+    "ai_description": "detailed description here",
+    "tags": ["tag1", "tag2", "tag3", "tag4", "tag5"]
+  }}
+]
+
+Include 8-12 total tags per item covering style, colors, and fit. Use the exact listing IDs given above."""
+
+
+def download_image(image_url):
+    """Download an image and return its raw bytes (None on failure)"""
+    response = requests.get(image_url, timeout=10)
+    if response.status_code != 200:
+        return None
+    return response.content
+
+def image_part(content):
+    """Build a chat image_url content part from raw image bytes"""
+    image_base64 = base64.b64encode(content).decode('utf-8')
+    return {
+        "type": "image_url",
+        "image_url": {
+            "url": f"data:image/jpeg;base64,{image_base64}"
+        }
+    }
+
+def clean_response_text(response_text):
+    """Strip markdown code fences from a model response"""
+    response_text = response_text.strip()
+    if response_text.startswith('```'):
+        # Remove ```json and ``` markers
+        response_text = response_text.replace('```json', '').replace('```', '').strip()
+    return response_text
+
+def validate_ai_data(ai_data):
+    """Return {'ai_description', 'tags'} if the model output is usable, else None"""
+    if not isinstance(ai_data, dict):
+        return None
+
+    description = ai_data.get('ai_description')
+    tags = ai_data.get('tags')
+    if not isinstance(description, str) or not description.strip():
+        return None
+    if not isinstance(tags, list):
+        return None
+
+    # Lowercase so the server's tag filters match regardless of model casing
+    tags = [str(tag).strip().lower() for tag in tags if isinstance(tag, (str, int, float)) and str(tag).strip()]
+    tags = list(dict.fromkeys(tags))
+    if not tags:
+        return None
+
+    return {
+        'ai_description': description.strip(),
+        'tags': tags
+    }
+
+def enhance_item_with_ai(item, image_content=None):
+    """Add AI description and tags to a single item"""
+
+    image_url = item.get('image', '')
+    name = item.get('name', 'Unknown')
+    category = item.get('category', 'Unknown')
+    price = item.get('price', 0)
+
+    if not image_url:
+        print(f"  ⚠️ No image for {name}, skipping")
+        return None
+
+    try:
+        # Download and encode image
+        if image_content is None:
+            print(f"  📸 Downloading image...")
+            image_content = download_image(image_url)
+        if not image_content:
+            print(f"  ⚠️ Failed to download image")
+            return None
+
+        # Ask Gemini to analyze
+        print(f"  🤖 Asking Gemini for analysis...")
+        completion = get_openrouter_client().chat.completions.create(
+            model=MODEL,
+            messages=[{
+                "role": "user",
+                "content": [
                     {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{image_base64}"
-                        }
-                    }
+                        "type": "text",
+                        "text": ITEM_PROMPT.format(name=name, category=category, price=price)
+                    },
+                    image_part(image_content)
                 ]
             }]
         )
-        
-        response_text = completion.choices[0].message.content.strip()
+
+        response_text = clean_response_text(completion.choices[0].message.content)
         print(f"  📝 Response: {response_text[:100]}...")
-        
-        # Clean response (remove markdown if present)
-        if response_text.startswith('```'):
-            # Remove ```json and ``` markers
-            response_text = response_text.replace('```json', '').replace('```', '').strip()
-        
-        # Parse JSON
-        import json
-        ai_data = json.loads(response_text)
-        
-        return {
-            'ai_description': ai_data.get('ai_description', ''),
-            'tags': ai_data.get('tags', [])
-        }
-        
+
+        ai_data = validate_ai_data(json.loads(response_text))
+        if not ai_data:
+            print(f"  ⚠️ Response missing description or tags")
+        return ai_data
+
     except Exception as e:
         print(f"  ❌ Error: {e}")
         import traceback
         traceback.print_exc()
         return None
 
-def enhance_database(sample_size=None):
-    """Enhance all items in database with AI analysis"""
-    
-    # Get items that need enhancement (don't have ai_description yet)
-    query = {'ai_description': {'$exists': False}}
-    
+def parse_batch_response(response_text, expected_ids):
+    """Parse a batch response into {listing_id: ai_data}, dropping malformed or unknown entries"""
+    response_text = clean_response_text(response_text)
+
+    # Tolerate chatter around the array
+    start = response_text.find('[')
+    end = response_text.rfind(']')
+    if start == -1 or end <= start:
+        return {}
+
+    try:
+        entries = json.loads(response_text[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+
+    results = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        listing_id = str(entry.get('id', '')).strip()
+        if listing_id not in expected_ids or listing_id in results:
+            continue
+        ai_data = validate_ai_data(entry)
+        if ai_data:
+            results[listing_id] = ai_data
+
+    return results
+
+def fetch_images(items):
+    """Download images for a batch of items, returning {listing_id: bytes}"""
+    images = {}
+    for item in items:
+        listing_id = str(item['_id'])
+        image_url = item.get('image', '')
+        if not image_url:
+            print(f"  ⚠️ No image for {item.get('name', 'Unknown')}, skipping")
+            continue
+        try:
+            content = download_image(image_url)
+        except Exception as e:
+            print(f"  ⚠️ Could not download image for {listing_id}: {e}")
+            content = None
+        if content:
+            images[listing_id] = content
+    return images
+
+def enhance_items_batch(items, images=None):
+    """Enhance several items with one vision call, falling back to single calls for misses
+
+    Returns a dict of {listing_id: ai_data} for every item that was enhanced.
+    """
+    results = {}
+
+    # Download everything first so one bad image doesn't sink the batch
+    if images is None:
+        images = fetch_images(items)
+
+    batch_items = [item for item in items if str(item['_id']) in images]
+
+    if len(batch_items) > 1:
+        items_text = ""
+        content = []
+        for item in batch_items:
+            items_text += f"- Listing ID: {item['_id']} | Name: {item.get('name', 'Unknown')} | Category: {item.get('category', 'Unknown')} | Price: ${item.get('price', 0):.2f}\n"
+
+        content.append({
+            "type": "text",
+            "text": BATCH_PROMPT.format(count=len(batch_items), items_text=items_text)
+        })
+        for item in batch_items:
+            content.append({"type": "text", "text": f"Listing ID: {item['_id']}"})
+            content.append(image_part(images[str(item['_id'])]))
+
+        try:
+            print(f"  🤖 Asking Gemini for analysis of {len(batch_items)} items...")
+            completion = get_openrouter_client().chat.completions.create(
+                model=MODEL,
+                messages=[{"role": "user", "content": content}]
+            )
+            response_text = completion.choices[0].message.content or ''
+            print(f"  📝 Response: {response_text[:100]}...")
+            results = parse_batch_response(response_text, set(images))
+        except Exception as e:
+            print(f"  ❌ Batch error: {e}")
+
+    # Anything the batch didn't cover gets a normal single-item call
+    for item in batch_items:
+        listing_id = str(item['_id'])
+        if listing_id in results:
+            continue
+        if len(batch_items) > 1:
+            print(f"  🔁 Falling back to single call for {listing_id}")
+        ai_data = enhance_item_with_ai(item, image_content=images[listing_id])
+        if ai_data:
+            results[listing_id] = ai_data
+
+    return results
+
+def input_hash(item):
+    """Hash of everything the model sees for an item (image URL, name, category, price)"""
+    inputs = [item.get('image', ''), item.get('name', ''), item.get('category', ''), item.get('price', 0)]
+    return hashlib.sha1(json.dumps(inputs, default=str).encode('utf-8')).hexdigest()
+
+def reindex_reason(item):
+    """Why an item needs (re-)enhancement: 'missing', 'version', 'inputs' or None"""
+    if 'ai_description' not in item:
+        return 'missing'
+    if item.get('ai_version') != AI_VERSION:
+        return 'version'
+    if item.get('ai_input_hash') != input_hash(item):
+        return 'inputs'
+    return None
+
+def save_ai_data(item, ai_data, duplicate_of=None):
+    """Write AI fields (and image hash / duplicate link) back to the listing"""
+    fields = {
+        'ai_description': ai_data['ai_description'],
+        'tags': ai_data['tags'],
+        'ai_version': AI_VERSION,
+        'ai_input_hash': input_hash(item),
+        'updated_at': time.time()
+    }
+    if item.get('image_hash'):
+        fields['image_hash'] = item['image_hash']
+
+    update = {'$set': fields}
+    if duplicate_of is not None:
+        fields['duplicate_of'] = duplicate_of
+    else:
+        update['$unset'] = {'duplicate_of': ''}
+
+    get_listings().update_one({'_id': item['_id']}, update)
+
+    if duplicate_of is not None:
+        print(f"  ♻️  Copied from near-duplicate {duplicate_of}: {item.get('name', 'Unknown')[:50]}")
+        return
+
+    print(f"  ✅ Updated {item.get('name', 'Unknown')[:50]}")
+    print(f"  📝 Description: {ai_data['ai_description'][:80]}...")
+    print(f"  🏷️  Tags: {', '.join(ai_data['tags'][:5])}...")
+
+def save_color_features(item, features):
+    """Store locally computed color/pattern features (independent of the AI fields)"""
+    get_listings().update_one({'_id': item['_id']}, {'$set': {
+        'color_features': {
+            'version': features['version'],
+            'color_hist': features['color_hist'],
+            'palette': features['palette'],
+            'texture': features['texture']
+        },
+        'color_names': features['color_names'],
+        'pattern': features['pattern'],
+        'updated_at': time.time()
+    }})
+
+def add_color_features(items, images):
+    """Compute and save features for every item with a downloaded image; returns how many"""
+    saved = 0
+    for item in items:
+        features = extract_features(images.get(str(item['_id'])))
+        if features:
+            save_color_features(item, features)
+            saved += 1
+    return saved
+
+def load_hash_index(current_only=False):
+    """Build a near-duplicate index over already enhanced, canonical listings
+
+    current_only limits it to listings enhanced with the current AI_VERSION.
+    """
+    index = HashIndex()
+    query = {
+        'image_hash': {'$exists': True},
+        'ai_description': {'$exists': True},
+        'duplicate_of': {'$exists': False}
+    }
+    if current_only:
+        query['ai_version'] = AI_VERSION
+    for doc in get_listings().find(query, {'image_hash': 1}):
+        index.add(doc['image_hash'], doc['_id'])
+    return index
+
+def get_ai_data(listing_id, ai_cache):
+    """AI fields of an enhanced listing, from this run's cache or the database"""
+    if listing_id not in ai_cache:
+        doc = get_listings().find_one({'_id': listing_id}, {'ai_description': 1, 'tags': 1})
+        ai_cache[listing_id] = validate_ai_data(doc) if doc else None
+    return ai_cache[listing_id]
+
+def process_batch(batch, hash_index=None, ai_cache=None):
+    """Download, dedup, enhance and save one batch of items
+
+    Returns counts of enhanced / duplicates / failed items, the per-item
+    outcome keyed by _id, and whether the model was called.
+    """
+    ai_cache = {} if ai_cache is None else ai_cache
+    outcome = {'enhanced': 0, 'duplicates': 0, 'failed': 0, 'items': {}, 'called_model': False}
+
+    def record(item, result):
+        outcome[result] += 1
+        outcome['items'][item['_id']] = result
+
+    images = fetch_images(batch)
+    if GENERATE_IMAGE_VARIANTS:
+        for listing_id, content in images.items():
+            generate_variants(listing_id, content)
+    # Saved before the model call so items it fails on still get features
+    if COLOR_FEATURES:
+        add_color_features(batch, images)
+
+    # Split the batch into items to send, copies of known listings,
+    # and followers of a near-identical item in this same batch
+    to_enhance = []
+    followers = {}
+    batch_hashes = HashIndex(hash_index.max_distance) if hash_index is not None else None
+    for item in batch:
+        image_hash = dhash(images.get(str(item['_id']))) if hash_index is not None else None
+        if image_hash:
+            item['image_hash'] = image_hash
+            source_id = hash_index.find(image_hash)
+            if source_id == item['_id']:
+                source_id = None
+            source_data = get_ai_data(source_id, ai_cache) if source_id is not None else None
+            if source_data:
+                save_ai_data(item, source_data, duplicate_of=source_id)
+                record(item, 'duplicates')
+                continue
+            leader_id = batch_hashes.find(image_hash)
+            if leader_id is not None:
+                followers.setdefault(leader_id, []).append(item)
+                continue
+            batch_hashes.add(image_hash, item['_id'])
+        to_enhance.append(item)
+
+    if not to_enhance:
+        results = {}
+    elif len(to_enhance) == 1:
+        item = to_enhance[0]
+        ai_data = enhance_item_with_ai(item, image_content=images.get(str(item['_id'])))
+        results = {str(item['_id']): ai_data} if ai_data else {}
+    else:
+        results = enhance_items_batch(to_enhance, images=images)
+    outcome['called_model'] = bool(to_enhance)
+
+    for item in to_enhance:
+        ai_data = results.get(str(item['_id']))
+        if ai_data:
+            save_ai_data(item, ai_data)
+            record(item, 'enhanced')
+            ai_cache[item['_id']] = ai_data
+            if item.get('image_hash'):
+                hash_index.add(item['image_hash'], item['_id'])
+        else:
+            record(item, 'failed')
+
+        for follower in followers.get(item['_id'], []):
+            if ai_data:
+                save_ai_data(follower, ai_data, duplicate_of=item['_id'])
+                record(follower, 'duplicates')
+            else:
+                record(follower, 'failed')
+
+    return outcome
+
+def select_items(reindex=False, sample_size=None):
+    """Items to process, with a count per reindex_reason
+
+    Without reindex only never-enhanced items are picked; with it, items
+    whose prompt/model version or input hash is out of date are too.
+    """
+    if not reindex:
+        cursor = get_listings().find({'ai_description': {'$exists': False}})
+        items = list(cursor.limit(sample_size) if sample_size else cursor)
+        return items, {'missing': len(items)}
+
+    items = []
+    reasons = {}
+    for item in get_listings().find({}):
+        reason = reindex_reason(item)
+        if reason is None:
+            continue
+        reasons[reason] = reasons.get(reason, 0) + 1
+        items.append(item)
+        if sample_size and len(items) >= sample_size:
+            break
+    return items, reasons
+
+def enhance_database(sample_size=None, batch_size=BATCH_SIZE, delay=2, dedup=True, reindex=False, dry_run=False):
+    """Enhance all items in database with AI analysis
+
+    batch_size > 1 packs that many listings into each model request;
+    delay is the pause between requests. With dedup, items whose image is a
+    near-duplicate of an enhanced listing copy its description and tags
+    instead of calling the model. reindex also re-processes items enhanced
+    with an older AI_VERSION or whose inputs changed; dry_run only reports
+    how many items would be processed.
+
+    Returns run stats: counts plus per-item latencies in seconds.
+    """
+
+    items, reasons = select_items(reindex, sample_size)
+
     if sample_size:
-        items = list(collection.find(query).limit(sample_size))
         print(f"🧪 SAMPLE MODE: Processing {len(items)} items\n")
     else:
-        items = list(collection.find(query))
         print(f"🚀 FULL MODE: Processing {len(items)} items\n")
-    
+
+    stats = {'successful': 0, 'failed': 0, 'duplicates': 0, 'latencies': [], 'reasons': reasons}
+
+    if reindex or dry_run:
+        print(f"🔎 Never enhanced: {reasons.get('missing', 0)}")
+        print(f"🔎 Prompt/model version changed: {reasons.get('version', 0)}")
+        print(f"🔎 Inputs changed: {reasons.get('inputs', 0)}")
+
+    if dry_run:
+        print(f"\n🧪 DRY RUN: {len(items)} items would be processed")
+        return stats
+
     if not items:
         print("✅ All items already enhanced!")
-        return
-    
+        return stats
+
     successful = 0
     failed = 0
-    
-    for idx, item in enumerate(items, 1):
-        print(f"\n[{idx}/{len(items)}] Processing: {item.get('name', 'Unknown')[:50]}")
-        print(f"  Category: {item.get('category')}")
-        print(f"  Price: ${item.get('price', 0):.2f}")
-        
-        ai_data = enhance_item_with_ai(item)
-        
-        if ai_data:
-            # Update item in database
-            collection.update_one(
-                {'_id': item['_id']},
-                {'$set': {
-                    'ai_description': ai_data['ai_description'],
-                    'tags': ai_data['tags']
-                }}
-            )
-            
-            print(f"  ✅ Updated!")
-            print(f"  📝 Description: {ai_data['ai_description'][:80]}...")
-            print(f"  🏷️  Tags: {', '.join(ai_data['tags'][:5])}...")
-            
-            successful += 1
+    duplicates = 0
+    batch_size = max(1, batch_size or 1)
+
+    hash_index = load_hash_index(current_only=reindex) if dedup else None
+    if hash_index is not None:
+        print(f"🧬 Hash index loaded with {len(hash_index)} enhanced images")
+    ai_cache = {}
+
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        batch_started = time.perf_counter()
+
+        if batch_size == 1:
+            item = batch[0]
+            print(f"\n[{start + 1}/{len(items)}] Processing: {item.get('name', 'Unknown')[:50]}")
+            print(f"  Category: {item.get('category')}")
+            print(f"  Price: ${item.get('price', 0):.2f}")
         else:
-            failed += 1
-        
+            print(f"\n[{start + 1}-{start + len(batch)}/{len(items)}] Processing batch of {len(batch)}")
+
+        outcome = process_batch(batch, hash_index, ai_cache)
+        successful += outcome['enhanced']
+        duplicates += outcome['duplicates']
+        failed += outcome['failed']
+
+        batch_elapsed = time.perf_counter() - batch_started
+        stats['latencies'].extend([batch_elapsed] * len(batch))
+
         # Rate limiting - be nice to the API
-        time.sleep(2)
-    
+        if outcome['called_model']:
+            time.sleep(delay)
+
     print(f"\n{'='*50}")
     print(f"✅ Successfully enhanced: {successful}")
+    print(f"♻️  Copied from near-duplicates: {duplicates}")
     print(f"❌ Failed: {failed}")
     print(f"{'='*50}")
 
+    stats.update(successful=successful, failed=failed, duplicates=duplicates)
+    return stats
+
+def backfill_color_features(sample_size=None, batch_size=16):
+    """Compute color features for listings missing them (or from an older FEATURE_VERSION)"""
+    cursor = get_listings().find(
+        {'color_features.version': {'$ne': FEATURE_VERSION}},
+        {'image': 1, 'name': 1}
+    )
+    items = list(cursor.limit(sample_size) if sample_size else cursor)
+    print(f"🎨 Computing color features for {len(items)} items")
+
+    saved = 0
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        saved += add_color_features(batch, fetch_images(batch))
+        print(f"  [{min(start + batch_size, len(items))}/{len(items)}] {saved} saved")
+
+    print(f"✅ Color features saved for {saved}/{len(items)} items")
+    return saved
+
+def normalize_stored_tags():
+    """Lowercase (and de-duplicate) tags saved before validate_ai_data did; returns how many changed"""
+    changed = 0
+    for doc in get_listings().find({'tags': {'$exists': True}}, {'tags': 1}):
+        tags = list(dict.fromkeys(str(tag).strip().lower() for tag in doc['tags'] if str(tag).strip()))
+        if tags != doc['tags']:
+            get_listings().update_one({'_id': doc['_id']}, {'$set': {'tags': tags, 'updated_at': time.time()}})
+            changed += 1
+    print(f"✅ Normalized tags on {changed} items")
+    return changed
+
 # Run on 10 items first
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="AI enhancement for ThriftTinder listings")
+    parser.add_argument('--sample', type=int, default=None, help="Only process this many items")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Listings per model request (1 = single-item calls)")
+    parser.add_argument('--no-dedup', action='store_true', help="Call the model even for near-duplicate images")
+    parser.add_argument('--reindex', action='store_true', help="Also redo items whose prompt version or inputs changed")
+    parser.add_argument('--dry-run', action='store_true', help="Only report how many items would be processed")
+    parser.add_argument('--features-only', action='store_true', help="Only compute local color features (no model calls)")
+    parser.add_argument('--normalize-tags', action='store_true', help="Only lowercase tags saved by older versions")
+    args = parser.parse_args()
+
     print("🎨 AI Enhancement Script for ThriftTinder")
     print("="*50)
-    
-    
-    enhance_database()
-    
-    print("\n💡 If this looks good, remove sample_size parameter to process all items!")
\ No newline at end of file
+
+    if args.features_only:
+        backfill_color_features(args.sample)
+        raise SystemExit(0)
+
+    if args.normalize_tags:
+        normalize_stored_tags()
+        raise SystemExit(0)
+
+    enhance_database(
+        sample_size=args.sample,
+        batch_size=args.batch_size,
+        dedup=not args.no_dedup,
+        reindex=args.reindex,
+        dry_run=args.dry_run
+    )
+
+    print("\n💡 If this looks good, remove sample_size parameter to process all items!")
@@ -0,0 +1,127 @@
+"""Known-URL filtering and idempotent bulk writes for the scrapers
+
+Both scrapers load the set of listing URLs once per run, drop duplicates
+before doing any product-page work, and write with upserts on url so
+re-running a crawl never inserts the same listing twice.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from pymongo import UpdateOne
+
+from index_queue import enqueue_listings
+
+# Above this many listings the known-URL filter switches to a Bloom filter
+BLOOM_THRESHOLD = 200000
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives)"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+class KnownUrlFilter:
+    """URLs already in the listings collection, loaded once per run
+
+    Uses a plain set for normal catalogs and a Bloom filter for very large
+    ones. A Bloom false positive only skips a listing we'd have written;
+    the upsert in save_listings keeps correctness either way.
+    """
+
+    def __init__(self, collection, bloom_threshold=BLOOM_THRESHOLD):
+        self.lock = threading.Lock()
+        count = collection.estimated_document_count() if hasattr(collection, 'estimated_document_count') else 0
+        if count > bloom_threshold:
+            self.urls = BloomFilter(capacity=count * 2)
+        else:
+            self.urls = set()
+
+        for doc in collection.find({}, {'url': 1, '_id': 0}):
+            if doc.get('url'):
+                self.urls.add(doc['url'])
+        kind = 'Bloom filter' if isinstance(self.urls, BloomFilter) else f"{len(self.urls)} URLs"
+        print(f"🧾 Loaded known listing URLs ({kind})")
+
+    def __contains__(self, url):
+        with self.lock:
+            return url in self.urls
+
+    def add(self, url):
+        with self.lock:
+            self.urls.add(url)
+
+    def claim(self, url):
+        """True (and remember it) if url is new; False if already known"""
+        with self.lock:
+            if url in self.urls:
+                return False
+            self.urls.add(url)
+            return True
+
+    def filter_new(self, items, key='url'):
+        """Items (or URL strings) whose URL hasn't been seen, marking them seen"""
+        new_items = []
+        for item in items:
+            url = item[key] if isinstance(item, dict) else item
+            if url and url != 'N/A' and self.claim(url):
+                new_items.append(item)
+        return new_items
+
+
+def ensure_url_index(collection):
+    """Index url so upserts and lookups don't scan the collection"""
+    collection.create_index('url')
+
+def ensure_listing_indexes(collection):
+    """url index plus the compound indexes behind the server's listing filters"""
+    ensure_url_index(collection)
+    collection.create_index([('category', 1), ('price', 1)])
+    collection.create_index([('category', 1), ('size', 1)])
+    collection.create_index([('tags', 1), ('category', 1), ('price', 1)])
+    collection.create_index([('color_names', 1), ('category', 1)])
+    # Catalog polls for listings changed since its last sync
+    collection.create_index('updated_at')
+
+def save_listings(collection, listings, enqueue=True):
+    """Bulk upsert listings on url; returns the _ids of newly inserted ones
+
+    Existing listings are left untouched ($setOnInsert), so repeated crawls
+    are idempotent. New IDs are queued for AI indexing.
+    """
+    if not listings:
+        return []
+
+    now = time.time()
+    operations = [
+        UpdateOne(
+            {'url': listing['url']},
+            {'$setOnInsert': dict({k: v for k, v in listing.items() if k != 'url'}, updated_at=now)},
+            upsert=True
+        )
+        for listing in listings
+    ]
+    result = collection.bulk_write(operations, ordered=False)
+    inserted_ids = list(result.upserted_ids.values())
+
+    if enqueue:
+        enqueue_listings(inserted_ids)
+    return inserted_ids
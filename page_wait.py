@@ -0,0 +1,92 @@
+"""Event-driven page readiness for the Selenium scrapers
+
+Instead of fixed sleeps, these helpers poll the DOM for what we actually
+need (product cards, a product title) and stop scrolling once a scroll
+stops producing new cards. StepTimer records how long each step really
+took so slow steps show up in the crawl summary.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+CARD_SELECTOR = 'a[href*="/products/"] img[src*="media-photos.depop.com"]'
+POLL = 0.1
+
+
+class StepTimer:
+    """Thread-safe wall-clock stats per named step"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+
+    @contextmanager
+    def step(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.samples.setdefault(name, []).append(elapsed)
+
+    def summary(self):
+        """Print count / mean / p95 / total seconds for every step"""
+        with self.lock:
+            samples = {name: sorted(values) for name, values in self.samples.items()}
+        if not samples:
+            return
+        print(f"\n⏱️  {'step':<16}{'count':>7}{'mean s':>9}{'p95 s':>9}{'total s':>10}")
+        for name, values in samples.items():
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            print(f"   {name:<16}{len(values):>7}{sum(values) / len(values):>9.2f}{p95:>9.2f}{sum(values):>10.1f}")
+
+
+def count_cards(driver, selector=CARD_SELECTOR):
+    return driver.execute_script("return document.querySelectorAll(arguments[0]).length", selector)
+
+def _at_least(min_count, selector):
+    def check(driver):
+        count = count_cards(driver, selector)
+        return count if count >= min_count else False
+    return check
+
+def wait_for_cards(driver, min_count=1, timeout=10, selector=CARD_SELECTOR):
+    """Wait until at least min_count product cards are in the DOM; returns the count (0 on timeout)"""
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL).until(_at_least(min_count, selector))
+    except TimeoutException:
+        return 0
+
+def scroll_until_stable(driver, max_scrolls=10, settle_timeout=2.0, target=None, selector=CARD_SELECTOR):
+    """Scroll to the bottom until a scroll adds no new cards (or target is reached)
+
+    Each scroll waits only until the card count grows, up to settle_timeout.
+    Returns the final card count.
+    """
+    count = count_cards(driver, selector)
+    for _ in range(max_scrolls):
+        if target and count >= target:
+            break
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        grown = wait_for_cards(driver, count + 1, settle_timeout, selector)
+        if not grown:
+            break
+        count = grown
+    return count
+
+def wait_for_product_page(driver, timeout=5):
+    """Wait until a product page has its title or embedded product data"""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL).until(
+            lambda d: d.execute_script(
+                "return !!(document.querySelector('h1') || "
+                "document.querySelector('script[type=\"application/ld+json\"]'))"
+            )
+        )
+        return True
+    except TimeoutException:
+        return False
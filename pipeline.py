@@ -0,0 +1,339 @@
+"""Streaming scrape pipeline: fetch -> parse -> normalize -> dedup -> batched insert
+
+Stages run in their own threads and hand items along bounded queues, so a
+slow stage (usually fetch, or Mongo on a bad day) pushes back on the ones
+before it instead of piling everything up in memory. Listings are upserted
+in small batches as they come out of dedup. A failing item (or insert
+batch) is logged and counted, never allowed to stop a stage, so STOP
+always reaches the end of the pipeline.
+
+    python pipeline.py --workers 4 --target 125 --batch-size 25
+"""
+import argparse
+import os
+import re
+import threading
+import time
+from queue import Queue, Empty
+
+import depop_http
+from depop_parse import extract_cards
+from listing_store import KnownUrlFilter, ensure_listing_indexes, save_listings
+from page_wait import wait_for_cards, scroll_until_stable
+from scrape_common import connect_to_db, clean_price, make_chrome_driver
+
+STOP = object()
+
+# Save rendered search pages here to build a parser benchmark corpus (bench_parse.py)
+FIXTURE_DIR = os.getenv('SCRAPER_FIXTURE_DIR')
+
+
+def save_fixture(html, url):
+    """Keep a copy of a rendered page when SCRAPER_FIXTURE_DIR is set"""
+    if not FIXTURE_DIR:
+        return
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    name = re.sub(r'[^A-Za-z0-9]+', '_', url.split('depop.com')[-1]).strip('_')[:100] or 'page'
+    with open(os.path.join(FIXTURE_DIR, f"{name}.html"), 'w', encoding='utf-8') as f:
+        f.write(html)
+
+
+class StageStats:
+    """Items in/out and busy time for one stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy = 0.0
+
+    def record(self, items_in, items_out, busy):
+        with self.lock:
+            self.items_in += items_in
+            self.items_out += items_out
+            self.busy += busy
+
+    def error(self, items, e):
+        with self.lock:
+            self.errors += items
+        print(f"  ⚠️ {self.name} stage failed on {items} item(s): {e}")
+
+
+class Pipeline:
+    def __init__(self, search_urls, collection, workers=4, target_items=125, batch_size=25,
+                 queue_size=64, use_http=True, dry_run=False):
+        self.search_urls = search_urls
+        self.collection = collection
+        self.workers = workers
+        self.target_items = target_items
+        self.batch_size = batch_size
+        self.use_http = use_http
+        self.dry_run = dry_run
+
+        self.fetched = Queue(maxsize=queue_size)
+        self.parsed = Queue(maxsize=queue_size)
+        self.normalized = Queue(maxsize=queue_size)
+        self.unique = Queue(maxsize=queue_size)
+
+        self.stats = {name: StageStats(name) for name in ('fetch', 'parse', 'normalize', 'dedup', 'insert')}
+        self.new_per_category = {category: 0 for category in search_urls}
+        self.new_per_query = {}
+        self.crawled_queries = []
+        self.duplicates = 0
+        self.inserted = 0
+        self.lock = threading.Lock()
+
+    def category_done(self, category):
+        with self.lock:
+            return self.new_per_category[category] >= self.target_items
+
+    # ===== STAGES =====
+
+    def fetch_worker(self, work):
+        """Search URL -> (category, url, page, kind)
+
+        kind 'json' means the products were already read from the page's
+        embedded state over plain HTTP (page is that product list); 'dom'
+        means the page was rendered in Chrome (page is its HTML). A page
+        whose embedded state has no products falls through to Chrome.
+        """
+        driver = None
+        try:
+            while True:
+                try:
+                    category, url = work.get_nowait()
+                except Empty:
+                    return
+                if self.category_done(category):
+                    continue
+
+                with self.lock:
+                    self.crawled_queries.append((category, url))
+                started = time.perf_counter()
+                page, kind = None, None
+                try:
+                    if self.use_http:
+                        page = depop_http.fetch_search_listings(url, category)
+                        if page is not None:
+                            kind = 'json'
+                    if kind is None:
+                        if driver is None:
+                            driver = make_chrome_driver()
+                        driver.get(url)
+                        if wait_for_cards(driver, timeout=10):
+                            scroll_until_stable(driver, max_scrolls=3)
+                        page, kind = driver.page_source, 'dom'
+                        save_fixture(page, url)
+                except Exception as e:
+                    self.stats['fetch'].error(1, f"{url}: {e}")
+                    page = None
+
+                self.stats['fetch'].record(1, 1 if page else 0, time.perf_counter() - started)
+                if page:
+                    self.fetched.put((category, url, page, kind))
+        finally:
+            if driver is not None:
+                driver.quit()
+
+    def run_stage(self, name, source, sink, handle):
+        """Feed every item from source through handle(), putting its outputs on sink
+
+        Errors are counted per item; STOP is always forwarded, even if
+        something unexpected escapes, and the source is drained so earlier
+        stages never block on a full queue.
+        """
+        stopped = False
+        try:
+            while True:
+                item = source.get()
+                if item is STOP:
+                    stopped = True
+                    return
+                started = time.perf_counter()
+                try:
+                    outputs = handle(item)
+                except Exception as e:
+                    self.stats[name].error(1, e)
+                    continue
+                self.stats[name].record(1, len(outputs), time.perf_counter() - started)
+                for output in outputs:
+                    sink.put(output)
+        finally:
+            sink.put(STOP)
+            while not stopped:
+                stopped = source.get() is STOP
+
+    def parse_page(self, fetched):
+        """Fetched page -> raw product records"""
+        category, query, page, kind = fetched
+        products = page if kind == 'json' else extract_cards(page, category)
+        return [(product, query) for product in products]
+
+    def normalize_product(self, item):
+        """Raw record -> listing in the listings schema (incomplete ones dropped)"""
+        product, query = item
+        url = product.get('url') or ''
+        image = product.get('image') or ''
+        if not (url.startswith('http') and image.startswith('http')):
+            return []
+        price = product.get('price', 0)
+        listing = {
+            'name': (product.get('name') or 'N/A').strip(),
+            'url': url,
+            'image': image.replace('/medium/', '/large/'),
+            'price': price if isinstance(price, float) else clean_price(str(price)),
+            'size': (product.get('size') or 'N/A').strip(),
+            'category': product['category']
+        }
+        return [(listing, query)]
+
+    def dedup_listing(self, item, known):
+        """Drop URLs already in the database or seen earlier in this run"""
+        listing, query = item
+        category = listing['category']
+        keep = not self.category_done(category) and known.claim(listing['url'])
+        with self.lock:
+            if keep:
+                self.new_per_category[category] += 1
+                self.new_per_query[query] = self.new_per_query.get(query, 0) + 1
+            else:
+                self.duplicates += 1
+        return [listing] if keep else []
+
+    def parse_stage(self):
+        self.run_stage('parse', self.fetched, self.parsed, self.parse_page)
+
+    def normalize_stage(self):
+        self.run_stage('normalize', self.parsed, self.normalized, self.normalize_product)
+
+    def dedup_stage(self, known):
+        self.run_stage('dedup', self.normalized, self.unique, lambda item: self.dedup_listing(item, known))
+
+    def insert_stage(self, flush_interval=5.0):
+        """Upsert listings in batches of batch_size (or every flush_interval seconds)"""
+        batch = []
+        last_flush = time.time()
+
+        def flush():
+            started = time.perf_counter()
+            try:
+                inserted = len(batch) if self.dry_run else len(save_listings(self.collection, batch))
+            except Exception as e:
+                # The batch is dropped; its URLs are picked up again by the next run
+                self.stats['insert'].error(len(batch), e)
+                inserted = None
+            if inserted is not None:
+                with self.lock:
+                    self.inserted += inserted
+                self.stats['insert'].record(len(batch), inserted, time.perf_counter() - started)
+            batch.clear()
+
+        while True:
+            try:
+                listing = self.unique.get(timeout=flush_interval)
+            except Empty:
+                listing = None
+            if listing is STOP:
+                break
+            if listing is not None:
+                batch.append(listing)
+            if batch and (len(batch) >= self.batch_size or time.time() - last_flush >= flush_interval):
+                flush()
+                last_flush = time.time()
+        if batch:
+            flush()
+
+    # ===== DRIVER =====
+
+    def report(self, elapsed):
+        print(f"\n{'stage':<11}{'in':>7}{'out':>7}{'errors':>8}{'busy s':>9}{'in/s':>9}")
+        for stage in self.stats.values():
+            rate = stage.items_in / elapsed if elapsed else 0.0
+            print(f"{stage.name:<11}{stage.items_in:>7}{stage.items_out:>7}{stage.errors:>8}{stage.busy:>9.1f}{rate:>9.1f}")
+
+    def run(self, progress_interval=10.0):
+        work = Queue()
+        longest = max((len(urls) for urls in self.search_urls.values()), default=0)
+        for idx in range(longest):
+            for category, urls in self.search_urls.items():
+                if idx < len(urls):
+                    work.put((category, urls[idx]))
+
+        if not self.dry_run:
+            ensure_listing_indexes(self.collection)
+        known = KnownUrlFilter(self.collection)
+
+        print(f"🚀 Pipeline: {work.qsize()} search URLs, {self.workers} fetchers, "
+              f"target {self.target_items}/category, insert batches of {self.batch_size}")
+
+        started = time.time()
+        fetchers = [threading.Thread(target=self.fetch_worker, args=(work,)) for _ in range(max(1, self.workers))]
+        stages = [
+            threading.Thread(target=self.parse_stage),
+            threading.Thread(target=self.normalize_stage),
+            threading.Thread(target=self.dedup_stage, args=(known,)),
+            threading.Thread(target=self.insert_stage),
+        ]
+        for thread in fetchers + stages:
+            thread.start()
+
+        last_progress = time.time()
+        while any(thread.is_alive() for thread in fetchers):
+            for thread in fetchers:
+                thread.join(timeout=1.0)
+            if time.time() - last_progress >= progress_interval:
+                print(f"  ⏳ fetched={self.stats['fetch'].items_out} parsed={self.stats['parse'].items_out} "
+                      f"new={sum(self.new_per_category.values())} inserted={self.inserted} "
+                      f"queues={self.fetched.qsize()}/{self.parsed.qsize()}/{self.normalized.qsize()}/{self.unique.qsize()}")
+                last_progress = time.time()
+
+        # Fetchers are done: drain the rest of the pipeline in order
+        self.fetched.put(STOP)
+        for thread in stages:
+            thread.join()
+
+        elapsed = time.time() - started
+        self.report(elapsed)
+        print(f"\n{'='*50}")
+        print(f"🎉 PIPELINE COMPLETE in {elapsed:.1f}s")
+        print(f"📈 New items added: {self.inserted}{' (dry run)' if self.dry_run else ''}")
+        print(f"🔄 Duplicates skipped: {self.duplicates}")
+        for category, count in self.new_per_category.items():
+            print(f"  {category}: +{count}")
+        print(f"{'='*50}")
+        return self.inserted
+
+
+if __name__ == '__main__':
+    from scraper import search_urls
+
+    parser = argparse.ArgumentParser(description="Streaming Depop scrape pipeline")
+    parser.add_argument('--workers', type=int, default=4, help="Concurrent fetchers")
+    parser.add_argument('--target', type=int, default=125, help="New listings per category")
+    parser.add_argument('--batch-size', type=int, default=25, help="Listings per bulk upsert")
+    parser.add_argument('--queue-size', type=int, default=64, help="Bound on each inter-stage queue")
+    parser.add_argument('--categories', help="Comma-separated subset of categories")
+    parser.add_argument('--no-http', action='store_true', help="Always render pages in Chrome")
+    parser.add_argument('--dry-run', action='store_true', help="Run every stage but skip the insert")
+    args = parser.parse_args()
+
+    urls = search_urls
+    if args.categories:
+        wanted = [c.strip() for c in args.categories.split(',')]
+        urls = {category: search_urls[category] for category in wanted if category in search_urls}
+
+    client, collection = connect_to_db()
+    try:
+        Pipeline(
+            urls, collection,
+            workers=args.workers,
+            target_items=args.target,
+            batch_size=args.batch_size,
+            queue_size=args.queue_size,
+            use_http=not args.no_http,
+            dry_run=args.dry_run
+        ).run()
+    finally:
+        client.close()
@@ -0,0 +1,50 @@
+"""Local (no model call) preference tracking and ranking for swipe sessions"""
+from color_features import color_similarity
+
+# Tag weight change per swipe action
+ACTION_WEIGHTS = {
+    'like': 0.1,
+    'dislike': -0.05,
+    'neutral': 0.0
+}
+
+# How much matching the liked items' colors counts next to tag weights
+COLOR_WEIGHT = 0.5
+
+
+def update_tag_weights(tag_weights, tags, action):
+    """Apply one swipe to a session's tag weights (kept between 0 and 1)"""
+    delta = ACTION_WEIGHTS.get(action, 0.0)
+    if delta:
+        for tag in tags or []:
+            tag_weights[tag] = max(0, min(1, tag_weights.get(tag, 0) + delta))
+    return tag_weights
+
+def color_hist(listing):
+    return (listing.get('color_features') or {}).get('color_hist')
+
+def mean_color_hist(listings):
+    """Average color_hist of the listings that have one (None if none do)"""
+    hists = [color_hist(listing) for listing in listings if color_hist(listing)]
+    if not hists:
+        return None
+    return [sum(values) / len(hists) for values in zip(*hists)]
+
+def score_listing(listing, tag_weights, liked_prices=None, liked_hist=None):
+    """Tag weight overlap plus color similarity, nudged towards the price range the user likes"""
+    score = sum(tag_weights.get(tag, 0) for tag in listing.get('tags', []))
+    if liked_hist:
+        score += COLOR_WEIGHT * color_similarity(color_hist(listing), liked_hist)
+    if liked_prices:
+        mean_price = sum(liked_prices) / len(liked_prices)
+        if mean_price > 0:
+            score -= 0.1 * min(1.0, abs(listing.get('price', 0) - mean_price) / mean_price)
+    return score
+
+def rank_listings(candidates, tag_weights, liked_items=None, limit=10):
+    """Best scoring candidates first (ties keep candidate order)"""
+    liked_prices = [item.get('price', 0) for item in liked_items or [] if item.get('price')]
+    liked_hist = mean_color_hist(liked_items or [])
+    scored = [(score_listing(listing, tag_weights, liked_prices, liked_hist), i) for i, listing in enumerate(candidates)]
+    scored.sort(key=lambda entry: (-entry[0], entry[1]))
+    return [candidates[i] for _, i in scored[:limit]]
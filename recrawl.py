@@ -0,0 +1,153 @@
+"""Yield-aware recrawl scheduling and sold/removed listing detection
+
+Every crawled search query gets a row in crawl_queries with its recent
+yield (new listings per crawl, smoothed) and when it was last crawled.
+`plan` spends a crawl budget on the queries most likely to produce new
+items, while stale low-yield queries still come up eventually. `check`
+revisits the least recently checked listings and marks sold or removed
+ones so the server stops serving them.
+
+    python recrawl.py run --budget 20
+    python recrawl.py check --limit 300
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import depop_http
+from scrape_common import connect_to_db
+
+# Weight of the latest crawl in the smoothed yield
+YIELD_ALPHA = 0.3
+
+# Yield assumed for queries that have never been crawled
+NEW_QUERY_YIELD = 1000.0
+
+# Score added per day since a query was last crawled, so nothing starves
+STALENESS_PER_DAY = 2.0
+
+DEAD_STATUSES = ['sold', 'removed']
+
+
+def queries_collection(collection):
+    return collection.database['crawl_queries']
+
+def plan_crawl(search_urls, queries, budget, now=None):
+    """Pick up to budget (category, url) pairs, best expected yield first"""
+    now = now or time.time()
+    history = {doc['_id']: doc for doc in queries.find({'_id': {'$in': [u for urls in search_urls.values() for u in urls]}})}
+
+    scored = []
+    for category, urls in search_urls.items():
+        for url in urls:
+            doc = history.get(url)
+            if doc is None:
+                score = NEW_QUERY_YIELD
+            else:
+                days = (now - doc.get('last_crawled', 0)) / 86400
+                score = doc.get('yield_ema', 0.0) + STALENESS_PER_DAY * days
+            scored.append((score, category, url))
+
+    scored.sort(key=lambda entry: entry[0], reverse=True)
+    return [(category, url, score) for score, category, url in scored[:budget]]
+
+def record_crawls(queries, crawled, new_per_query, now=None):
+    """Update yield stats for every query crawled in a run"""
+    now = now or time.time()
+    for category, url in crawled:
+        new_count = new_per_query.get(url, 0)
+        doc = queries.find_one({'_id': url}) or {}
+        previous = doc.get('yield_ema')
+        yield_ema = new_count if previous is None else YIELD_ALPHA * new_count + (1 - YIELD_ALPHA) * previous
+        update = {
+            'category': category,
+            'last_crawled': now,
+            'last_yield': new_count,
+            'yield_ema': yield_ema
+        }
+        if new_count:
+            update['last_new_at'] = now
+        queries.update_one(
+            {'_id': url},
+            {'$set': update, '$inc': {'runs': 1, 'total_new': new_count}},
+            upsert=True
+        )
+
+def check_listings(collection, limit=200, workers=8, min_age_days=1):
+    """Re-fetch the least recently checked live listings and mark sold/removed ones
+
+    Returns counts per resulting status.
+    """
+    cutoff = time.time() - min_age_days * 86400
+    query = {
+        'status': {'$nin': DEAD_STATUSES},
+        '$or': [{'last_checked': {'$exists': False}}, {'last_checked': {'$lt': cutoff}}]
+    }
+    listings = list(collection.find(query, {'url': 1}).sort('last_checked', 1).limit(limit))
+    print(f"🔎 Checking {len(listings)} listings...")
+
+    def check(listing):
+        return listing, depop_http.fetch_listing_status(listing['url'])
+
+    counts = {'live': 0, 'sold': 0, 'removed': 0, 'unknown': 0}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for listing, status in pool.map(check, listings):
+            if status is None:
+                counts['unknown'] += 1
+                continue
+            counts[status] += 1
+            fields = {'last_checked': time.time()}
+            if status in DEAD_STATUSES:
+                fields['status'] = status
+                fields['updated_at'] = fields['last_checked']
+                print(f"  🪦 {status}: {listing['url']}")
+            collection.update_one({'_id': listing['_id']}, {'$set': fields})
+
+    print(f"✅ live={counts['live']} sold={counts['sold']} removed={counts['removed']} unchecked={counts['unknown']}")
+    return counts
+
+
+if __name__ == '__main__':
+    from scraper import search_urls
+
+    parser = argparse.ArgumentParser(description="Recrawl scheduler and sold-listing checker")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    plan_parser = sub.add_parser('plan', help="Show which queries the next run would crawl")
+    plan_parser.add_argument('--budget', type=int, default=20)
+
+    run_parser = sub.add_parser('run', help="Crawl the planned queries through the pipeline")
+    run_parser.add_argument('--budget', type=int, default=20, help="Search queries to crawl")
+    run_parser.add_argument('--workers', type=int, default=4)
+    run_parser.add_argument('--target', type=int, default=125, help="New listings per category")
+
+    check_parser = sub.add_parser('check', help="Mark sold/removed listings")
+    check_parser.add_argument('--limit', type=int, default=200)
+    check_parser.add_argument('--workers', type=int, default=8)
+    check_parser.add_argument('--min-age-days', type=float, default=1)
+
+    args = parser.parse_args()
+    client, collection = connect_to_db()
+    queries = queries_collection(collection)
+
+    try:
+        if args.command in ('plan', 'run'):
+            plan = plan_crawl(search_urls, queries, args.budget)
+            print(f"📋 Crawl plan ({len(plan)} queries):")
+            for category, url, score in plan:
+                print(f"  {score:8.1f}  {category:<14} {url.split('q=')[-1][:50]}")
+
+        if args.command == 'run':
+            from pipeline import Pipeline
+
+            planned = {}
+            for category, url, _ in plan:
+                planned.setdefault(category, []).append(url)
+            pipeline = Pipeline(planned, collection, workers=args.workers, target_items=args.target)
+            pipeline.run()
+            record_crawls(queries, pipeline.crawled_queries, pipeline.new_per_query)
+
+        elif args.command == 'check':
+            check_listings(collection, args.limit, args.workers, args.min_age_days)
+    finally:
+        client.close()
@@ -0,0 +1,148 @@
+"""Replay recorded swipe logs through recommendation strategies, offline
+
+Walks every session in the log in time order. After each like it asks
+each strategy for recommendations given only the swipes so far, and
+counts a hit when a recommended listing is one the user went on to like
+later in the session. Reports hit rate, hits per request and latency.
+
+    python replay_swipes.py --log swipe_log.jsonl --strategies random,tags
+    python replay_swipes.py --mongo --catalog catalog.jsonl --strategies tags,ai
+"""
+import argparse
+import json
+import random
+import time
+
+import clients
+from catalog import Catalog
+from ranking import rank_listings, update_tag_weights
+from swipe_log import SWIPE_LOG_PATH, SWIPE_COLLECTION, read_events
+
+
+def load_catalog_file(path):
+    """Catalog from a JSONL export of listing documents"""
+    catalog = Catalog()
+    listings = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                doc = json.loads(line)
+                doc['_id'] = str(doc['_id'])
+                listings[doc['_id']] = doc
+    catalog.listings = listings
+    catalog.loaded_at = time.time()
+    return catalog
+
+def random_strategy(seed=0):
+    rng = random.Random(seed)
+
+    def recommend(catalog, liked_items, tag_weights, category, shown, limit):
+        candidates = catalog.candidates(category, shown)
+        return rng.sample(candidates, min(limit, len(candidates)))
+    return recommend
+
+def tags_strategy():
+    def recommend(catalog, liked_items, tag_weights, category, shown, limit):
+        return rank_listings(catalog.candidates(category, shown), tag_weights, liked_items, limit)
+    return recommend
+
+def ai_strategy():
+    """The server's Gemini path (makes real model calls)"""
+    import server
+
+    def recommend(catalog, liked_items, tag_weights, category, shown, limit):
+        server.catalog = catalog
+        return server.get_ai_recommendations(server.format_for_ai(liked_items), liked_items, category, shown)[:limit]
+    return recommend
+
+STRATEGIES = {
+    'random': random_strategy,
+    'tags': tags_strategy,
+    'ai': ai_strategy
+}
+
+
+def group_sessions(events):
+    sessions = {}
+    for event in events:
+        sessions.setdefault(event['session_id'], []).append(event)
+    return sessions
+
+def replay(sessions, catalog, recommend, limit=10, max_requests=None):
+    """Replay every session through one strategy; returns per-request results"""
+    results = []
+    for session_events in sessions.values():
+        liked_later = [event['listing_id'] for event in session_events if event['action'] == 'like']
+        tag_weights = {}
+        shown = set()
+        liked_items = []
+        likes_seen = 0
+        requests_made = 0
+
+        for event in session_events:
+            listing = catalog.get(event['listing_id'])
+            shown.add(event['listing_id'])
+            update_tag_weights(tag_weights, listing.get('tags', []) if listing else [], event['action'])
+            if event['action'] != 'like':
+                continue
+            likes_seen += 1
+            if listing:
+                liked_items.append(listing)
+            future = set(liked_later[likes_seen:])
+            if not liked_items or not future:
+                continue
+            if max_requests and requests_made >= max_requests:
+                break
+
+            started = time.perf_counter()
+            recommendations = recommend(catalog, liked_items, tag_weights, liked_items[0].get('category'), shown, limit)
+            elapsed = time.perf_counter() - started
+            requests_made += 1
+
+            hits = sum(1 for rec in recommendations if str(rec['_id']) in future)
+            results.append({'latency': elapsed, 'hits': hits, 'returned': len(recommendations)})
+    return results
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare recommendation strategies on recorded swipes")
+    parser.add_argument('--log', default=SWIPE_LOG_PATH, help="JSONL swipe log")
+    parser.add_argument('--mongo', action='store_true', help=f"Read the {SWIPE_COLLECTION} collection instead of --log")
+    parser.add_argument('--catalog', help="JSONL listings export (default: load from MongoDB)")
+    parser.add_argument('--strategies', default='random,tags', help=f"Comma-separated subset of: {', '.join(STRATEGIES)}")
+    parser.add_argument('--limit', type=int, default=10, help="Recommendations per request")
+    parser.add_argument('--max-requests', type=int, help="Recommendation requests per session")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    events = read_events(collection=clients.get_db()[SWIPE_COLLECTION]) if args.mongo else read_events(args.log)
+    sessions = group_sessions(events)
+
+    if args.catalog:
+        catalog = load_catalog_file(args.catalog)
+    else:
+        catalog = Catalog()
+        catalog.load(clients.get_listings())
+
+    print(f"🔁 Replaying {len(events)} swipes from {len(sessions)} sessions against {len(catalog.listings)} listings\n")
+    print(f"{'strategy':<10}{'requests':>10}{'hit rate':>10}{'hits/req':>10}{'p50 ms':>10}{'p95 ms':>10}")
+
+    for name in args.strategies.split(','):
+        name = name.strip()
+        if name not in STRATEGIES:
+            print(f"⚠️ Unknown strategy {name}, skipping")
+            continue
+        strategy = STRATEGIES[name](args.seed) if name == 'random' else STRATEGIES[name]()
+        results = replay(sessions, catalog, strategy, args.limit, args.max_requests)
+        latencies = [result['latency'] for result in results]
+        hit_rate = sum(1 for result in results if result['hits']) / len(results) if results else 0.0
+        hits_per_request = sum(result['hits'] for result in results) / len(results) if results else 0.0
+        print(f"{name:<10}{len(results):>10}{hit_rate:>10.1%}{hits_per_request:>10.2f}"
+              f"{percentile(latencies, 50) * 1000:>10.1f}{percentile(latencies, 95) * 1000:>10.1f}")
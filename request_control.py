@@ -0,0 +1,128 @@
+"""Concurrency controls for the expensive recommendation path
+
+- SingleFlight: concurrent calls with the same key share one computation
+- SessionLimiter: caps how many computations one session can run at once
+- ModelLimiter: caps outstanding model calls across the whole process
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+# Distinct recommendation computations one session may run at once
+SESSION_CONCURRENCY = int(os.getenv('SESSION_CONCURRENCY', '2'))
+
+# Model calls allowed in flight per process, and how long to queue for one
+MODEL_CONCURRENCY = int(os.getenv('MODEL_CONCURRENCY', '4'))
+MODEL_QUEUE_TIMEOUT = float(os.getenv('MODEL_QUEUE_TIMEOUT', '10'))
+
+
+class Busy(Exception):
+    """A limit was hit; the caller should retry later"""
+
+class SessionBusy(Busy):
+    pass
+
+class ModelBusy(Busy):
+    pass
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.stats = {'leaders': 0, 'coalesced': 0}
+
+    def do(self, key, fn):
+        """Run fn() once per key at a time; callers arriving meanwhile get the same result"""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+                self.stats['leaders'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self):
+        with self.lock:
+            return len(self.calls)
+
+
+class SessionLimiter:
+    def __init__(self, max_per_session=SESSION_CONCURRENCY):
+        self.max_per_session = max_per_session
+        self.lock = threading.Lock()
+        self.active = {}
+        self.stats = {'rejected': 0}
+
+    @contextmanager
+    def slot(self, session_id):
+        """Hold one of the session's slots, or raise SessionBusy if they're all taken"""
+        with self.lock:
+            if self.active.get(session_id, 0) >= self.max_per_session:
+                self.stats['rejected'] += 1
+                raise SessionBusy(f"Too many recommendation requests in flight for session {session_id}")
+            self.active[session_id] = self.active.get(session_id, 0) + 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.active[session_id] -= 1
+                if not self.active[session_id]:
+                    del self.active[session_id]
+
+
+class ModelLimiter:
+    def __init__(self, max_calls=MODEL_CONCURRENCY, queue_timeout=MODEL_QUEUE_TIMEOUT):
+        self.max_calls = max_calls
+        self.queue_timeout = queue_timeout
+        self.semaphore = threading.BoundedSemaphore(max_calls)
+        self.lock = threading.Lock()
+        self.stats = {'calls': 0, 'in_flight': 0, 'waiting': 0, 'timeouts': 0}
+
+    @contextmanager
+    def slot(self, timeout=None):
+        """Hold a model call slot, queueing up to timeout seconds before raising ModelBusy"""
+        timeout = self.queue_timeout if timeout is None else timeout
+        with self.lock:
+            self.stats['waiting'] += 1
+        acquired = self.semaphore.acquire(timeout=timeout)
+        with self.lock:
+            self.stats['waiting'] -= 1
+            if not acquired:
+                self.stats['timeouts'] += 1
+            else:
+                self.stats['calls'] += 1
+                self.stats['in_flight'] += 1
+        if not acquired:
+            raise ModelBusy("Model call limit reached")
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.stats['in_flight'] -= 1
+            self.semaphore.release()
@@ -0,0 +1,71 @@
+"""Pieces shared by scraper.py, scraper2.py and pipeline.py"""
+import os
+import threading
+
+from pymongo import MongoClient
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.firefox.service import Service as FirefoxService
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from dotenv import load_dotenv
+
+from depop_http import HEADERS, parse_price
+
+load_dotenv()
+
+_driver_paths = {}
+_driver_paths_lock = threading.Lock()
+
+
+def connect_to_db():
+    """Connect to MongoDB Atlas; returns (client, listings collection)"""
+    client = MongoClient(os.getenv('MONGODB_URI'))
+    db = client['thrifttinderDB']
+    collection = db['listings']
+    return client, collection
+
+def clean_price(price_text):
+    """Convert '$25.00' to 25.00"""
+    return parse_price(price_text)
+
+def _driver_path(browser):
+    # Resolve each driver binary once; concurrent installs from several workers race
+    with _driver_paths_lock:
+        if browser not in _driver_paths:
+            if browser == 'chrome':
+                from webdriver_manager.chrome import ChromeDriverManager
+                _driver_paths[browser] = ChromeDriverManager().install()
+            else:
+                from webdriver_manager.firefox import GeckoDriverManager
+                _driver_paths[browser] = GeckoDriverManager().install()
+        return _driver_paths[browser]
+
+def make_chrome_driver():
+    """Start a headless Chrome driver"""
+    chrome_options = ChromeOptions()
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option("useAutomationExtension", False)
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument(f"user-agent={HEADERS['User-Agent']}")
+
+    return webdriver.Chrome(
+        service=ChromeService(_driver_path('chrome')),
+        options=chrome_options
+    )
+
+def make_firefox_driver():
+    """Start a headless Firefox driver"""
+    firefox_options = FirefoxOptions()
+    firefox_options.add_argument('--headless')
+    firefox_options.add_argument('--no-sandbox')
+    firefox_options.add_argument('--disable-dev-shm-usage')
+
+    return webdriver.Firefox(
+        service=FirefoxService(_driver_path('firefox')),
+        options=firefox_options
+    )
@@ -1,41 +1,41 @@
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.firefox import GeckoDriverManager
 from bs4 import BeautifulSoup
-from pymongo import MongoClient
-import time
+from scrape_common import connect_to_db, clean_price, make_firefox_driver
+from listing_store import KnownUrlFilter, ensure_listing_indexes, save_listings
+import depop_http
+from page_wait import StepTimer, wait_for_cards, scroll_until_stable, wait_for_product_page
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
 import re
+import threading
 from dotenv import load_dotenv
 load_dotenv()
 
-def connect_to_db():
-    """Connect to MongoDB Atlas"""
-    # MongoDB Atlas connection string
-    MONGODB_URI = os.getenv('MONGODB_URI')
-    client = MongoClient(MONGODB_URI)
-    
-    db = client['thrifttinderDB']
-    collection = db['listings']
-    return client, collection
+# Per-step timings for the run summary
+step_timer = StepTimer()
+
+# Product pages fetched in parallel, and how many finished listings to buffer per write
+DETAIL_WORKERS = int(os.getenv('SCRAPER_DETAIL_WORKERS', '8'))
+WRITE_BATCH = 20
 
 def extract_price(price_text):
     """Extract numeric price from text like '$25.00'"""
-    try:
-        # Remove currency symbols and extract number
-        price_str = re.sub(r'[^\d.]', '', price_text)
-        return float(price_str)
-    except:
-        return 0.0
+    return clean_price(price_text)
+
+def fetch_product(drivers, product_url):
+    """Product details over HTTP, falling back to this thread's browser"""
+    # Fast path: embedded page JSON over plain HTTP, no rendering
+    with step_timer.step('http_product'):
+        details = depop_http.fetch_product_details(product_url)
+    if details:
+        return details
+    return scrape_product_details(drivers.get(), product_url)
 
 def scrape_product_details(driver, product_url):
     """Visit individual product page and extract details"""
     try:
-        driver.get(product_url)
-        time.sleep(1)  # Brief wait for page load
+        with step_timer.step('product_load'):
+            driver.get(product_url)
+            wait_for_product_page(driver)
         
         soup = BeautifulSoup(driver.page_source, 'html.parser')
         
@@ -114,22 +114,38 @@ def initialize_driver():
     Returns:
         WebDriver instance
     """
-    # Set up Firefox options for headless mode
-    firefox_options = FirefoxOptions()
-    firefox_options.add_argument('--headless')
-    firefox_options.add_argument('--no-sandbox')
-    firefox_options.add_argument('--disable-dev-shm-usage')
-
-    # Initialize Firefox driver
-    driver = webdriver.Firefox(
-        service=FirefoxService(GeckoDriverManager().install()),
-        options=firefox_options
-    )
+    driver = make_firefox_driver()
     print("🦊 Using Firefox browser")
 
     return driver
 
-def scrape_depop(url, save_to_db=True, max_products=100):
+class DriverPool:
+    """One lazily started browser per worker thread, quit together at the end"""
+
+    def __init__(self):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.drivers = []
+
+    def get(self):
+        driver = getattr(self.local, 'driver', None)
+        if driver is None:
+            driver = initialize_driver()
+            self.local.driver = driver
+            with self.lock:
+                self.drivers.append(driver)
+        return driver
+
+    def quit_all(self):
+        with self.lock:
+            drivers, self.drivers = self.drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+def scrape_depop(url, save_to_db=True, max_products=100, workers=DETAIL_WORKERS):
     """
     Scrape Depop listings
 
@@ -137,9 +153,12 @@ def scrape_depop(url, save_to_db=True, max_products=100):
         url (str): Depop category URL to scrape
         save_to_db (bool): Whether to save results to MongoDB
         max_products (int): Maximum number of products to scrape
+        workers (int): Product pages fetched concurrently
     """
     # Initialize driver
     driver = initialize_driver()
+    detail_drivers = DriverPool()
+    saved_count = 0
     
     # Connect to MongoDB if saving
     if save_to_db:
@@ -151,22 +170,16 @@ def scrape_depop(url, save_to_db=True, max_products=100):
         driver.get(url)
         
         # Wait for products to load
-        wait = WebDriverWait(driver, 10)
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'img[src*="media-photos.depop.com"]')))
+        with step_timer.step('wait_cards'):
+            if not wait_for_cards(driver, timeout=10):
+                raise TimeoutError("No product cards appeared")
         
-        # Scroll to load more products (Depop uses lazy loading)
+        # Scroll to load more products (Depop uses lazy loading),
+        # stopping once a scroll brings in no new cards
         print("Scrolling to load products...")
-        last_height = driver.execute_script("return document.body.scrollHeight")
-        scroll_attempts = 10  # More scrolls to get ~100 products
-        
-        for scroll in range(scroll_attempts):
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            print(f"  Scroll {scroll + 1}/{scroll_attempts}")
-            if new_height == last_height:
-                break
-            last_height = new_height
+        with step_timer.step('scroll'):
+            card_count = scroll_until_stable(driver, max_scrolls=10, target=max_products)
+        print(f"  {card_count} product cards loaded")
         
         # Get page source and parse
         html = driver.page_source
@@ -184,6 +197,14 @@ def scrape_depop(url, save_to_db=True, max_products=100):
         
         print(f"Found {len(product_links)} product links")
         
+        # Skip listings we already have before visiting any product page
+        if save_to_db:
+            ensure_listing_indexes(collection)
+            known = KnownUrlFilter(collection)
+            link_count = len(product_links)
+            product_links = known.filter_new(product_links)
+            print(f"Skipping {link_count - len(product_links)} already in database")
+        
         # Limit to max_products
         product_links = product_links[:max_products]
         print(f"Scraping first {len(product_links)} products in detail...")
@@ -199,14 +220,32 @@ def scrape_depop(url, save_to_db=True, max_products=100):
         elif "jackets" in url.lower():
             category = "Outerwear"
         
-        # Deep scrape each product
+        # Deep scrape products concurrently, writing results as they land
+        # so a failure late in the run doesn't lose what was already fetched
         listings = []
-        for idx, product_url in enumerate(product_links, 1):
-            print(f"\n[{idx}/{len(product_links)}] Scraping: {product_url}")
-            
-            details = scrape_product_details(driver, product_url)
-            
-            if details:
+        pending = []
+        
+        def flush():
+            nonlocal saved_count
+            if save_to_db and pending:
+                inserted_ids = save_listings(collection, pending)
+                saved_count += len(inserted_ids)
+                print(f"  💾 Saved {len(inserted_ids)} listings (total {saved_count})")
+            pending.clear()
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(fetch_product, detail_drivers, product_url): product_url for product_url in product_links}
+            for idx, future in enumerate(as_completed(futures), 1):
+                product_url = futures[future]
+                try:
+                    details = future.result()
+                except Exception as e:
+                    print(f"\n[{idx}/{len(product_links)}] ⚠️  Error scraping {product_url}: {e}")
+                    continue
+                
+                if not details:
+                    continue
+                
                 listing = {
                     'name': details['name'],
                     'style': category,
@@ -217,13 +256,17 @@ def scrape_depop(url, save_to_db=True, max_products=100):
                     'image': details['image']
                 }
                 listings.append(listing)
-                print(f"  ✅ {details['name'][:50]} - ${details['price']:.2f} - {details['brand']} - Size {details['size']}")
+                pending.append(listing)
+                print(f"\n[{idx}/{len(product_links)}] ✅ {details['name'][:50]} - ${details['price']:.2f} - {details['brand']} - Size {details['size']}")
+                
+                if len(pending) >= WRITE_BATCH:
+                    flush()
         
-        # Save to MongoDB
-        if save_to_db and listings:
-            print(f"\nSaving {len(listings)} listings to MongoDB...")
-            result = collection.insert_many(listings)
-            print(f"✅ Saved {len(result.inserted_ids)} listings to thrifttinderDB")
+        flush()
+        step_timer.summary()
+        
+        if save_to_db:
+            print(f"\n✅ Saved {saved_count} listings to thrifttinderDB")
             
             # Show stats
             total = collection.count_documents({})
@@ -241,6 +284,7 @@ def scrape_depop(url, save_to_db=True, max_products=100):
         
     finally:
         driver.quit()
+        detail_drivers.quit_all()
         if save_to_db:
             client.close()
 
@@ -1,37 +1,66 @@
-from flask import Flask, jsonify, request
-from pymongo import MongoClient
+from flask import Flask, Blueprint, current_app, jsonify, request, send_file, redirect
 from bson import ObjectId
-from openai import OpenAI
 import json
 import requests
 import base64
 import os
+import threading
+import time
 from dotenv import load_dotenv
 import re
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from color_features import COLOR_NAMES
+from catalog import Catalog, listing_filter_query, visible_listings_query
+from clients import OPENROUTER_TIMEOUT, get_db, get_listings, get_openrouter_client
+from image_cache import VARIANTS, add_image_variants, ensure_variant, variant_etag
+from ranking import rank_listings, update_tag_weights
+from request_control import SingleFlight, SessionLimiter, ModelLimiter, SessionBusy, ModelBusy
+from swipe_log import SwipeLog, SWIPE_COLLECTION
 
 from flask_cors import CORS
 
 # Load environment variables
 load_dotenv()
 
-app = Flask(__name__)
-CORS(app)
+# Catalog warm-up on startup: 'background' (serve while loading), 'blocking' or 'off'
+WARM_CATALOG = os.getenv('WARM_CATALOG', 'background')
 
-# MongoDB connection
-MONGODB_URI = os.getenv('MONGODB_URI')
-client = MongoClient(MONGODB_URI)
-db = client['thrifttinderDB']
-collection = db['listings']
+# Seconds a recommendation request may take before the local ranking is served instead
+RECOMMENDATION_DEADLINE = float(os.getenv('RECOMMENDATION_DEADLINE', '8'))
 
-# OpenRouter client for AI
-openrouter_client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=os.getenv('OPENROUTER_API_KEY')
-)
+# Fewer AI picks than this counts as a miss and the local ranking is served
+MIN_AI_RESULTS = int(os.getenv('MIN_AI_RESULTS', '3'))
+
+# Browser/CDN cache lifetime for proxied images (they never change in place)
+IMAGE_MAX_AGE = 365 * 24 * 3600
+
+# Listing ID -> original image URL for the image proxy (oldest evicted first)
+IMAGE_URL_CACHE_SIZE = 20000
+image_urls = {}
+image_urls_lock = threading.Lock()
+
+api = Blueprint('api', __name__)
+
+# Warm snapshot of servable listings (see catalog.py)
+catalog = Catalog()
 
 # Swipe session storage
 swipe_sessions = {}
 
+# Durable record of every swipe (see swipe_log.py)
+swipe_log = SwipeLog(get_collection=lambda: get_db()[SWIPE_COLLECTION])
+
+# Recommendation concurrency controls (see request_control.py)
+recommendation_flights = SingleFlight()
+session_limiter = SessionLimiter()
+model_limiter = ModelLimiter()
+
+# Runs the AI path so the request thread can stop waiting at the deadline
+ai_executor = ThreadPoolExecutor(max_workers=int(os.getenv('AI_WORKERS', '8')), thread_name_prefix='ai')
+metrics_lock = threading.Lock()
+recommendation_sources = {'ai': 0, 'local': 0}
+fallback_reasons = {'deadline': 0, 'too_few': 0, 'model_busy': 0, 'error': 0}
+
 # Custom JSON encoder to handle ObjectId
 class JSONEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -39,38 +68,114 @@ class JSONEncoder(json.JSONEncoder):
             return str(obj)
         return super().default(obj)
 
-app.json_encoder = JSONEncoder
+def create_app(warm=None):
+    """Build the Flask app; nothing connects to MongoDB or OpenRouter until first use
+
+    Run with `python server.py`, or `gunicorn 'server:create_app()'`.
+    """
+    warm = warm or WARM_CATALOG
+    app = Flask(__name__)
+    CORS(app)
+    app.json_encoder = JSONEncoder
+    app.config['WARM_CATALOG'] = warm
+    app.register_blueprint(api)
+
+    if warm == 'blocking' and not catalog.loaded:
+        try:
+            count = catalog.load(get_listings())
+            print(f"📦 Catalog loaded: {count} listings in {catalog.load_seconds:.2f}s")
+        except Exception as e:
+            catalog.error = str(e)
+            print(f"⚠️ Catalog load failed: {e}")
+    if warm in ('background', 'blocking') and catalog.thread is None:
+        catalog.start(get_listings)
+    return app
+
+@api.route('/api/ready', methods=['GET'])
+def get_ready():
+    """Readiness probe: 200 once warm caches are loaded (or warm-up is off)"""
+    warm = current_app.config.get('WARM_CATALOG')
+    ready = warm == 'off' or catalog.loaded
+    return jsonify({
+        'ready': ready,
+        'warm_catalog': warm,
+        'catalog': catalog.status()
+    }), 200 if ready else 503
 
 # ===== LISTING ROUTES =====
 
-@app.route('/api/listings/random/<int:count>', methods=['GET'])
+def parse_list_arg(name):
+    """Comma-separated query parameter as a list of non-empty values"""
+    return [value.strip() for value in request.args.get(name, '').split(',') if value.strip()]
+
+def parse_listing_filters():
+    """Price/size/tag filters from the query string (raises ValueError on bad input)"""
+    filters = {}
+    for name in ('min_price', 'max_price'):
+        value = request.args.get(name)
+        if value:
+            try:
+                filters[name] = float(value)
+            except ValueError:
+                raise ValueError(f'{name} must be a number')
+    if filters.get('min_price') is not None and filters.get('max_price') is not None \
+            and filters['min_price'] > filters['max_price']:
+        raise ValueError('min_price must not be greater than max_price')
+    if parse_list_arg('size'):
+        filters['sizes'] = parse_list_arg('size')
+    if parse_list_arg('tags'):
+        filters['tags'] = [tag.lower() for tag in parse_list_arg('tags')]
+    if parse_list_arg('exclude_tags'):
+        filters['exclude_tags'] = [tag.lower() for tag in parse_list_arg('exclude_tags')]
+    if parse_list_arg('colors'):
+        colors = [color.lower() for color in parse_list_arg('colors')]
+        unknown = [color for color in colors if color not in COLOR_NAMES]
+        if unknown:
+            raise ValueError(f'Unknown colors: {", ".join(unknown)}. Must be among: {", ".join(COLOR_NAMES)}')
+        filters['colors'] = colors
+    return filters
+
+@api.route('/api/listings/random/<int:count>', methods=['GET'])
 def get_random_listings(count):
-    """Get random listings with optional category filter - excludes already shown items"""
+    """Get random listings with optional category, price, size and tag filters - excludes already shown items
+
+    Filters: min_price, max_price, size (comma-separated, any of), tags
+    (comma-separated, all of), exclude_tags (comma-separated, none of),
+    colors (comma-separated, any of; locally extracted color names).
+    """
     try:
         category = request.args.get('category')
         session_id = request.args.get('session_id', 'default')
         
         # Build query
-        query = {}
         if category:
             valid_categories = ["mens_shirts", "mens_jeans", "womens_tops", "womens_skirts"]
             if category not in valid_categories:
                 return jsonify({
                     'error': f'Invalid category. Must be one of: {", ".join(valid_categories)}'
                 }), 400
-            query['category'] = category
+        try:
+            filters = parse_listing_filters()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Exclude already shown items
+        shown_items = set()
         if session_id in swipe_sessions:
             shown_items = swipe_sessions[session_id].get('shown_items', set())
             if shown_items:
-                query['_id'] = {'$nin': [ObjectId(item_id) for item_id in shown_items]}
                 print(f"  🚫 Excluding {len(shown_items)} already shown items")
         
-        listings = list(collection.aggregate([
-            {'$match': query},
-            {'$sample': {'size': count}}
-        ]))
+        if catalog.loaded:
+            listings = catalog.sample(count, category, shown_items, filters)
+        else:
+            query = listing_filter_query(dict(filters, category=category))
+            if shown_items:
+                query['_id'] = {'$nin': [ObjectId(item_id) for item_id in shown_items]}
+            listings = list(get_listings().aggregate([
+                {'$match': visible_listings_query(query)},
+                {'$sample': {'size': count}}
+            ]))
 
         # Track these items as shown
         if session_id not in swipe_sessions:
@@ -84,11 +189,13 @@ def get_random_listings(count):
             listing_id = str(listing['_id'])
             swipe_sessions[session_id]['shown_items'].add(listing_id)
             listing['_id'] = listing_id
+            add_image_variants(listing)
 
         print(f"  📊 Showing {len(listings)} new items (total shown: {len(swipe_sessions[session_id]['shown_items'])})")
 
         return jsonify({
             'category': category,
+            'filters': filters,
             'count': len(listings),
             'products': listings
         }), 200
@@ -96,16 +203,86 @@ def get_random_listings(count):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/stats', methods=['GET'])
+@api.route('/api/listings/<listing_id>/duplicates', methods=['GET'])
+def get_listing_duplicates(listing_id):
+    """Get the near-duplicate cluster a listing belongs to"""
+    try:
+        listing = get_listings().find_one({'_id': ObjectId(listing_id)}, {'duplicate_of': 1})
+        if not listing:
+            return jsonify({'error': 'Listing not found'}), 404
+
+        canonical_id = listing.get('duplicate_of', listing['_id'])
+        members = get_listings().find(
+            {'$or': [{'_id': canonical_id}, {'duplicate_of': canonical_id}]},
+            {'_id': 1}
+        )
+
+        return jsonify({
+            'canonical_id': str(canonical_id),
+            'listing_ids': [str(member['_id']) for member in members]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def listing_image_url(listing_id):
+    """Original image URL of a listing
+
+    Found URLs are cached (listings' images don't change); misses aren't,
+    so a listing scraped after its first lookup is served once it exists.
+    """
+    image_url = image_urls.get(listing_id)
+    if image_url:
+        return image_url
+    listing = catalog.get(listing_id) or get_listings().find_one({'_id': ObjectId(listing_id)}, {'image': 1})
+    image_url = listing.get('image') if listing else None
+    if image_url:
+        with image_urls_lock:
+            if len(image_urls) >= IMAGE_URL_CACHE_SIZE:
+                image_urls.pop(next(iter(image_urls)))
+            image_urls[listing_id] = image_url
+    return image_url
+
+@api.route('/api/images/<listing_id>/<variant>.jpg', methods=['GET'])
+def get_listing_image(listing_id, variant):
+    """Serve a resized listing image (thumb/medium) from the local disk cache"""
+    if variant not in VARIANTS:
+        return jsonify({'error': f'Invalid variant. Must be one of: {", ".join(VARIANTS)}'}), 404
+    try:
+        image_url = listing_image_url(listing_id)
+    except Exception:
+        image_url = None
+    if not image_url:
+        return jsonify({'error': 'Listing not found'}), 404
+
+    cache_control = f'public, max-age={IMAGE_MAX_AGE}, immutable'
+    etag = variant_etag(image_url, variant)
+
+    # Revalidation doesn't need to touch the disk at all
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = cache_control
+        return response
+
+    path = ensure_variant(listing_id, image_url, variant)
+    if not path:
+        # Can't resize here - let the client load the original
+        return redirect(image_url)
+
+    response = send_file(path, mimetype='image/jpeg', conditional=True, etag=etag, max_age=IMAGE_MAX_AGE)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+@api.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get statistics about the listings database"""
     try:
-        total_count = collection.count_documents({})
+        total_count = get_listings().count_documents({})
         
         # Category breakdown
         category_stats = []
         for category in ["mens_shirts", "mens_jeans", "womens_tops", "womens_skirts"]:
-            count = collection.count_documents({"category": category})
+            count = get_listings().count_documents({"category": category})
             category_stats.append({"category": category, "count": count})
 
         return jsonify({
@@ -117,7 +294,7 @@ def get_stats():
 
 # ===== SWIPE & RECOMMENDATION ROUTES =====
 
-@app.route('/api/swipe', methods=['POST'])
+@api.route('/api/swipe', methods=['POST'])
 def record_swipe():
     """Record user's swipe and update tag weights - handles like/dislike/neutral"""
     try:
@@ -131,12 +308,10 @@ def record_swipe():
         if action not in valid_actions:
             return jsonify({'error': f'Invalid action. Must be one of: {", ".join(valid_actions)}'}), 400
 
-        listing = collection.find_one({'_id': ObjectId(listing_id)})
+        listing = catalog.get(listing_id) or get_listings().find_one({'_id': ObjectId(listing_id)}, {'tags': 1})
 
         if not listing:
             return jsonify({'error': 'Listing not found'}), 404
-
-        listing['_id'] = str(listing['_id'])
         
         # Initialize session if needed
         if session_id not in swipe_sessions:
@@ -151,26 +326,17 @@ def record_swipe():
         # Mark item as shown
         session['shown_items'].add(listing_id)
 
-        # Record swipe
+        # Record swipe (IDs only - listings are looked up again when needed)
+        swipe_time = time.time()
         session['swipes'].append({
-            'listing': listing,
-            'action': action
+            'listing_id': listing_id,
+            'action': action,
+            'ts': swipe_time
         })
+        swipe_log.record(session_id, listing_id, action, swipe_time)
         
-        # Update tag weights based on action
-        item_tags = listing.get('tags', [])
-        
-        if action == 'like':
-            for tag in item_tags:
-                session['tag_weights'][tag] = session['tag_weights'].get(tag, 0) + 0.1
-        elif action == 'dislike':
-            for tag in item_tags:
-                session['tag_weights'][tag] = session['tag_weights'].get(tag, 0) - 0.05
-        # Neutral/skip: no weight change, but still tracked
-        
-        # Keep weights between 0 and 1
-        for tag in session['tag_weights']:
-            session['tag_weights'][tag] = max(0, min(1, session['tag_weights'][tag]))
+        # Update tag weights based on action (neutral/skip: no change, but still tracked)
+        update_tag_weights(session['tag_weights'], listing.get('tags', []), action)
 
         liked_count = len([s for s in session['swipes'] if s['action'] == 'like'])
         disliked_count = len([s for s in session['swipes'] if s['action'] == 'dislike'])
@@ -191,7 +357,7 @@ def record_swipe():
         print(f"❌ Error in swipe: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/session/<session_id>', methods=['GET'])
+@api.route('/api/session/<session_id>', methods=['GET'])
 def get_session_info(session_id):
     """Get info about a swipe session"""
     if session_id not in swipe_sessions:
@@ -214,7 +380,7 @@ def get_session_info(session_id):
         'can_get_recommendations': liked_count >= 1
     }), 200
 
-@app.route('/api/session/<session_id>/reset', methods=['POST'])
+@api.route('/api/session/<session_id>/reset', methods=['POST'])
 def reset_session(session_id):
     """Reset a swipe session (clear history)"""
     if session_id in swipe_sessions:
@@ -228,7 +394,7 @@ def reset_session(session_id):
         'message': 'Session not found'
     }), 404
 
-@app.route('/api/recommendations', methods=['POST'])
+@api.route('/api/recommendations', methods=['POST'])
 def get_recommendations():
     """Get AI-powered visual recommendations using Gemini - with optional category filter and duplicate prevention"""
     try:
@@ -239,41 +405,125 @@ def get_recommendations():
         if session_id not in swipe_sessions:
             return jsonify({'error': 'No swipe history found'}), 404
 
+        # Duplicate requests (retries, double taps) wait for and share one computation
+        body, status = recommendation_flights.do(
+            (session_id, category),
+            lambda: build_recommendations(session_id, category)
+        )
+        return jsonify(body), status
+
+    except SessionBusy as e:
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = '1'
+        return response, 429
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Concurrency counters for the recommendation path"""
+    return jsonify({
+        'recommendations': {
+            'in_flight': recommendation_flights.in_flight(),
+            **recommendation_flights.stats,
+            'session_rejected': session_limiter.stats['rejected']
+        },
+        'sources': recommendation_sources,
+        'fallback_reasons': fallback_reasons,
+        'model_calls': {'limit': model_limiter.max_calls, **model_limiter.stats},
+        'swipe_log': swipe_log.stats
+    }), 200
+
+def build_recommendations(session_id, category=None):
+    """Recommendations for a session as (response body, status)
+
+    The AI path runs against RECOMMENDATION_DEADLINE while the local ranking
+    is computed alongside it; the AI picks win if they arrive in time and
+    there are enough of them, otherwise the local ranking is served.
+    """
+    started = time.monotonic()
+    deadline = started + RECOMMENDATION_DEADLINE
+    with session_limiter.slot(session_id):
         session = swipe_sessions[session_id]
-        liked_items = [s['listing'] for s in session['swipes'] if s['action'] == 'like']
+        liked_items = get_listings_by_id([s['listing_id'] for s in session['swipes'] if s['action'] == 'like'])
 
         if len(liked_items) == 0:
-            return jsonify({'error': 'No liked items yet'}), 400
-        
+            return {'error': 'No liked items yet'}, 400
+
         # Use provided category or infer from first liked item
         if not category:
             category = liked_items[0].get('category')
-        
+
         print(f"🤖 Getting AI recommendations for {len(liked_items)} liked items in category: {category}")
-        
+
         liked_items_text = format_for_ai(liked_items)
-        shown_items = session.get('shown_items', set())
-        recommendations = get_ai_recommendations(liked_items_text, liked_items, category, shown_items)
-        
+        shown_items = set(session.get('shown_items', set()))
+        candidates = recommendation_candidates(category, shown_items)
+        ai_future = ai_executor.submit(
+            get_ai_recommendations, liked_items_text, liked_items, category, shown_items, deadline, candidates
+        )
+        local_recommendations = rank_listings(candidates, session['tag_weights'], liked_items, limit=10)
+
+        fallback_reason = None
+        try:
+            recommendations = ai_future.result(timeout=max(0, deadline - time.monotonic()))
+            if len(recommendations) < min(MIN_AI_RESULTS, len(local_recommendations)):
+                fallback_reason = 'too_few'
+        except FutureTimeout:
+            fallback_reason = 'deadline'
+        except ModelBusy:
+            fallback_reason = 'model_busy'
+        except Exception as e:
+            print(f"❌ AI path failed: {e}")
+            fallback_reason = 'error'
+
+        source = 'ai'
+        if fallback_reason:
+            source = 'local'
+            recommendations = [add_image_variants(dict(listing)) for listing in local_recommendations]
+        with metrics_lock:
+            recommendation_sources[source] += 1
+            if fallback_reason:
+                fallback_reasons[fallback_reason] += 1
+        elapsed = time.monotonic() - started
+        print(f"⏱️ Serving {len(recommendations)} {source} recommendations after {elapsed:.2f}s"
+              + (f" ({fallback_reason})" if fallback_reason else ""))
+
         # Mark recommendations as shown
         for rec in recommendations:
             session['shown_items'].add(rec['_id'])
-        
-        return jsonify({
+
+        return {
             'category': category,
             'liked_count': len(liked_items),
             'count': len(recommendations),
+            'source': source,
+            'fallback_reason': fallback_reason,
+            'elapsed': round(elapsed, 3),
             'products': recommendations
-        }), 200
-
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        }, 200
 
 # ===== AI HELPER FUNCTIONS =====
 
+def get_listings_by_id(listing_ids):
+    """Listing documents in the given order, from the catalog where possible"""
+    found = {}
+    missing = []
+    for listing_id in listing_ids:
+        listing = catalog.get(listing_id)
+        if listing:
+            found[listing_id] = dict(listing)
+        else:
+            missing.append(ObjectId(listing_id))
+    if missing:
+        for listing in get_listings().find({'_id': {'$in': missing}}):
+            listing['_id'] = str(listing['_id'])
+            found[listing['_id']] = listing
+    return [found[listing_id] for listing_id in listing_ids if listing_id in found]
+
 def format_for_ai(liked_items):
     """Format liked items for AI"""
     formatted_text = "USER'S LIKED ITEMS:\n\n"
@@ -283,27 +533,50 @@ def format_for_ai(liked_items):
 - Name: {item.get('name', 'Unknown')}
 - Category: {item.get('category', 'Unknown')}
 - Tags: {', '.join(item.get('tags', []))}
+- Colors: {', '.join(item.get('color_names', [])) or 'Unknown'}
 - Price: ${item.get('price', 0):.2f}
 ---
 """
 
     return formatted_text
 
-def get_ai_recommendations(liked_items_text, liked_items, user_category=None, exclude_shown=None):
-    """Get recommendations from Gemini via OpenRouter with IMAGE ANALYSIS - excludes shown items"""
-    
-    # Build query
+def recommendation_candidates(user_category=None, exclude_shown=None):
+    """Visible listings not yet shown, from the catalog when it's warm"""
+    if catalog.loaded:
+        return catalog.candidates(user_category, exclude_shown)
+
     query = {}
     if user_category:
         query['category'] = user_category
-        print(f"  🔍 Filtering to category: {user_category}")
-    
-    # Exclude items that have already been shown
-    if exclude_shown and len(exclude_shown) > 0:
+    if exclude_shown:
         query['_id'] = {'$nin': [ObjectId(item_id) for item_id in exclude_shown]}
+    listings = list(get_listings().find(visible_listings_query(query)))
+    for listing in listings:
+        listing['_id'] = str(listing['_id'])
+    return listings
+
+def remaining_time(deadline, cap):
+    """Seconds left before deadline, at most cap (cap itself without a deadline)"""
+    if deadline is None:
+        return cap
+    return max(0.0, min(cap, deadline - time.monotonic()))
+
+def get_ai_recommendations(liked_items_text, liked_items, user_category=None, exclude_shown=None,
+                           deadline=None, candidates=None):
+    """Get recommendations from Gemini via OpenRouter with IMAGE ANALYSIS - excludes shown items
+
+    deadline (time.monotonic()) bounds the image downloads, the wait for a
+    model slot and the model call itself; with a deadline, model API errors
+    are raised instead of returning []. candidates skips the lookup when
+    the caller already has them.
+    """
+    
+    if user_category:
+        print(f"  🔍 Filtering to category: {user_category}")
+    if exclude_shown:
         print(f"  🚫 Excluding {len(exclude_shown)} already shown items")
     
-    all_listings = list(collection.find(query))
+    all_listings = candidates if candidates is not None else recommendation_candidates(user_category, exclude_shown)
     print(f"  📊 Found {len(all_listings)} NEW items to analyze")
     
     if len(all_listings) == 0:
@@ -320,9 +593,12 @@ def get_ai_recommendations(liked_items_text, liked_items, user_category=None, ex
     for idx, item in enumerate(liked_items, 1):
         image_url = item.get('image', '')
         if image_url:
+            if remaining_time(deadline, 10) <= 0:
+                print(f"  ⏱️ Deadline reached, skipping remaining images")
+                break
             try:
                 print(f"  📸 Downloading image {idx}: {image_url[:50]}...")
-                response = requests.get(image_url, timeout=10)
+                response = requests.get(image_url, timeout=remaining_time(deadline, 10))
                 if response.status_code == 200:
                     image_base64 = base64.b64encode(response.content).decode('utf-8')
                     image_contents.append({
@@ -373,15 +649,17 @@ Return the IDs now:"""
     try:
         print(f"\n🤖 Sending {len(image_contents)} images + text to Gemini for analysis...")
 
-        completion = openrouter_client.chat.completions.create(
-            model="google/gemini-2.5-flash",
-            messages=[
-                {
-                    "role": "user",
-                    "content": message_content
-                }
-            ]
-        )
+        with model_limiter.slot(timeout=remaining_time(deadline, model_limiter.queue_timeout)):
+            completion = get_openrouter_client().chat.completions.create(
+                model="google/gemini-2.5-flash",
+                messages=[
+                    {
+                        "role": "user",
+                        "content": message_content
+                    }
+                ],
+                timeout=max(1.0, remaining_time(deadline, OPENROUTER_TIMEOUT))
+            )
 
         response_text = completion.choices[0].message.content.strip()
         print(f"\n🤖 AI RESPONSE:\n{response_text[:200]}...\n")
@@ -391,35 +669,44 @@ Return the IDs now:"""
 
         print(f"📝 Found {len(found_ids)} potential IDs")
 
+        # Only IDs from the candidate list: anything else may be sold, a
+        # near-duplicate or already shown
+        candidates_by_id = {str(item['_id']): item for item in all_listings}
         recommendations = []
-        for id_str in found_ids[:10]:
-            try:
-                listing = collection.find_one({'_id': ObjectId(id_str)})
-                if listing:
-                    listing['_id'] = str(listing['_id'])
-                    recommendations.append(listing)
-                    print(f"  ✅ Added: {listing.get('name', 'Unknown')[:40]}")
-            except Exception as e:
-                print(f"  ⚠️ Could not fetch {id_str}: {e}")
+        for id_str in dict.fromkeys(found_ids):
+            listing = candidates_by_id.get(id_str)
+            if listing is None:
+                print(f"  ⚠️ Skipping {id_str}: not one of the candidates")
                 continue
+            listing = dict(listing, _id=id_str)
+            recommendations.append(add_image_variants(listing))
+            print(f"  ✅ Added: {listing.get('name', 'Unknown')[:40]}")
+            if len(recommendations) == 10:
+                break
 
         print(f"\n✅ Returning {len(recommendations)} NEW recommendations\n")
         return recommendations
 
+    except ModelBusy:
+        raise
     except Exception as e:
         print(f"❌ AI API Error: {e}")
         import traceback
         traceback.print_exc()
+        if deadline is not None:
+            # The caller falls back to the local ranking and records 'error'
+            raise
         return []
 
 if __name__ == '__main__':
     print("🚀 ThriftTinder API starting...")
+    app = create_app()
     try:
-        count = collection.count_documents({})
+        count = get_listings().count_documents({})
         print(f"📊 Database has {count} listings")
         
         for category in ["mens_shirts", "mens_jeans", "womens_tops", "womens_skirts"]:
-            cat_count = collection.count_documents({"category": category})
+            cat_count = get_listings().count_documents({"category": category})
             print(f"  {category}: {cat_count} items")
     except Exception as e:
         print(f"⚠️ Database connection issue: {e}")
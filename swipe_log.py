@@ -0,0 +1,119 @@
+"""Append-only swipe event log, written in batches off the request path
+
+Each event is just {session_id, listing_id, action, ts}. Requests only put
+events on a bounded in-memory queue; a background thread appends them to a
+JSONL file or a MongoDB collection in batches. If the writer falls too far
+behind, new events are dropped (and counted) rather than slowing swipes.
+
+    SWIPE_LOG=file SWIPE_LOG_PATH=swipe_log.jsonl   (default)
+    SWIPE_LOG=mongo                                 (swipe_events collection)
+    SWIPE_LOG=off
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+
+SWIPE_LOG = os.getenv('SWIPE_LOG', 'file')
+SWIPE_LOG_PATH = os.getenv('SWIPE_LOG_PATH', 'swipe_log.jsonl')
+SWIPE_COLLECTION = 'swipe_events'
+
+# Write once this many events are pending, or after FLUSH_INTERVAL seconds
+FLUSH_SIZE = 200
+FLUSH_INTERVAL = 1.0
+
+# Events buffered before new ones are dropped
+MAX_PENDING = 50000
+
+
+class SwipeLog:
+    def __init__(self, sink=SWIPE_LOG, path=SWIPE_LOG_PATH, get_collection=None,
+                 flush_size=FLUSH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.sink = sink
+        self.path = path
+        self.get_collection = get_collection
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.pending = queue.Queue(maxsize=MAX_PENDING)
+        self.thread = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.stats = {'written': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+
+    def record(self, session_id, listing_id, action, ts=None):
+        """Queue one swipe; never blocks the caller"""
+        if self.sink == 'off':
+            return
+        self.start()
+        event = {'session_id': session_id, 'listing_id': listing_id, 'action': action, 'ts': ts or time.time()}
+        try:
+            self.pending.put_nowait(event)
+        except queue.Full:
+            self.stats['dropped'] += 1
+
+    def start(self):
+        if self.thread is None:
+            with self.lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._run, name='swipe-log', daemon=True)
+                    self.thread.start()
+                    atexit.register(self.close)
+
+    def _next_batch(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.flush_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.pending.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self.stop_event.is_set() and self.pending.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        try:
+            if self.sink == 'mongo':
+                self.get_collection().insert_many([dict(event) for event in batch], ordered=False)
+            else:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(json.dumps(event) + '\n' for event in batch))
+            self.stats['written'] += len(batch)
+            self.stats['batches'] += 1
+        except Exception as e:
+            self.stats['failed'] += len(batch)
+            print(f"⚠️ Could not write {len(batch)} swipe events: {e}")
+
+    def close(self, timeout=5):
+        """Flush everything queued so far and stop the writer"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+
+def read_events(path=SWIPE_LOG_PATH, collection=None):
+    """Recorded events in time order, from a JSONL file or a swipe_events collection"""
+    if collection is not None:
+        return list(collection.find({}, {'_id': 0}).sort('ts', 1))
+
+    events = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # torn final line from a crash
+    events.sort(key=lambda event: event['ts'])
+    return events